@@ -14,22 +14,41 @@ into a single, well-formatted Markdown answer.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
+import os
 import re
-from pathlib import Path
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional
 
+import numpy as np
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 from langchain_openai import AzureChatOpenAI
 from langchain.chains import RetrievalQA
 from langchain_community.agent_toolkits.sql.base import create_sql_agent
 from langchain_community.agent_toolkits.sql.toolkit import SQLDatabaseToolkit
 from langchain_community.utilities import SQLDatabase
-from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    BaseCallbackHandler,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.retrievers import BaseRetriever
 
 from app.config import get_settings
 from app.utils.token_counter import add_tokens
 from app.utils.llm_cache import get_chat_llm, get_vectorstore
+from app.utils.semantic_cache import SemanticResponseCache, embed_query
+
+try:
+    import faiss  # optional — exact inner-product search over the intent cache
+except ImportError:  # numpy brute-force fallback
+    faiss = None
 
 logger = logging.getLogger(__name__)
 
@@ -39,37 +58,66 @@ logger = logging.getLogger(__name__)
 
 _BANK_INDEX_NAME = "bank"  # hardcoded Azure AI Search index
 
-_DB_PATH = Path(__file__).resolve().parent.parent.parent / "db" / "banking.db"
-_DB_URI = f"sqlite:///{_DB_PATH}"
+# Caps concurrent policy retrievals (speculative + regular) against Azure AI
+# Search; held only for the search itself, not the answer generation
+_POLICY_SEARCH_LIMIT = asyncio.Semaphore(8)
+
+# Plain string joins — avoids Path.resolve()'s realpath/stat calls at import
+_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "db",
+    "banking.db",
+)
+# mode=rw: a missing file fails on first connect instead of being created empty
+_DB_URI = f"sqlite:///file:{_DB_PATH}?mode=rw&uri=true"
+
+# SQLite pragmas applied to every pooled connection: WAL lets concurrent
+# agent queries read in parallel; a large page cache + mmap cut read syscalls.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-262144",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+@lru_cache(maxsize=1)
+def _get_db() -> SQLDatabase:
+    """Build (once) the pooled engine and ``SQLDatabase`` on first use."""
+    engine = create_engine(
+        _DB_URI,
+        poolclass=QueuePool,
+        pool_size=8,
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return SQLDatabase(engine=engine)
 
-# SQLite database (created once)
-_db = SQLDatabase.from_uri(_DB_URI)
 
 # ---------------------------------------------------------------------------
 # System prompt for the SQL sub-agent
 # ---------------------------------------------------------------------------
 
 _SQL_PREFIX = """\
-You are the Banking SQL Agent inside Enso (Multi Agent AI Hub).
-You have access to a SQLite database named **banking.db** with these tables:
-
-• **branches** (branch_id, branch_name, address, city, state, zip_code, phone, manager_name, opened_date)
-• **customers** (customer_id, first_name, last_name, email, phone, date_of_birth, ssn_last4, address, city, state, zip_code, member_since, credit_score, annual_income, branch_id, status)
-• **accounts** (account_id, customer_id, account_type, account_number, routing_number, balance, interest_rate, opened_date, status)
-• **transactions** (transaction_id, account_id, transaction_date, post_date, description, category, amount, transaction_type [credit/debit], balance_after, reference_number, channel)
-• **loans** (loan_id, customer_id, loan_type, principal_amount, interest_rate, term_months, monthly_payment, remaining_balance, origination_date, maturity_date, status, collateral)
-• **cards** (card_id, customer_id, account_id, card_type, card_network, card_number_last4, expiration_date, credit_limit, current_balance, reward_points, issued_date, status)
-• **fraud_alerts** (alert_id, customer_id, account_id, card_id, alert_date, alert_type, description, amount, merchant, location, status, resolution, resolved_date)
-• **customer_support** (ticket_id, customer_id, topic, subject, description, priority, status, channel, created_date, resolved_date, assigned_to)
+You are the Banking SQL Agent inside Enso (Multi Agent AI Hub), querying SQLite **banking.db**.
+Tables: branches, customers, accounts, transactions, loans, cards, fraud_alerts, customer_support.
+Call sql_db_schema for the tables you need before writing a query.
 
 Rules:
-1. Always provide a brief natural-language summary of your findings.
-2. Present tabular data in a **Markdown table**.
-3. Show the SQL query you used in a ```sql code block.
-4. When looking up a customer by name, use case-insensitive LIKE matching.
-5. Format currency values with $ and commas.
-6. Be concise, accurate, and helpful — you are a bank customer-service assistant.
-7. NEVER reveal full account numbers of SSNs — show only the last 4 digits.
+1. Give a brief natural-language summary; present tabular data as a **Markdown table**.
+2. Show the SQL query you used in a ```sql code block.
+3. Match customer names with case-insensitive LIKE; format currency with $ and commas.
+4. Be concise and accurate. NEVER reveal full account numbers or SSNs — last 4 digits only.
 """
 
 # ---------------------------------------------------------------------------
@@ -87,6 +135,137 @@ Return ONLY one of these labels (no extra text):
 - GENERAL     — a general banking question that can be answered from common knowledge without needing the database or policy document
 """
 
+# Keyword fast path — one linear scan scores both intents.  Specific terms
+# weigh 2, generic ones ("account", "card", "my", "rate" …) weigh 1, so a
+# lone generic word never decides the route on its own.
+_INTENT_KEYWORDS_RE = re.compile(
+    r"\b(?:(?P<data_strong>balances?|transactions?|statements?|fraud|alerts?|tickets?"
+    r"|customers?|branch(?:es)?)"
+    r"|(?P<data_weak>accounts?|cards?|loans?|my|mine)"
+    r"|(?P<policy_strong>polic(?:y|ies)|fees?|overdrafts?|regulations?|compliance"
+    r"|handbook|terms)"
+    r"|(?P<policy_weak>rates?|wires?|limits?|rules?))\b",
+    re.IGNORECASE,
+)
+_KEYWORD_WEIGHTS = {"data_strong": 2, "data_weak": 1, "policy_strong": 2, "policy_weak": 1}
+
+
+def _keyword_intent(query: str) -> str | None:
+    """Return DATA / POLICY on a clear keyword winner, else ``None``.
+
+    A side wins only with a score of at least 2 while the other side has
+    no hits at all; weak, tied or mixed matches go to the LLM classifier.
+    """
+    hits = {(m.lastgroup, m.group(0).lower()) for m in _INTENT_KEYWORDS_RE.finditer(query)}
+    data = sum(_KEYWORD_WEIGHTS[g] for g, _ in hits if g.startswith("data"))
+    policy = sum(_KEYWORD_WEIGHTS[g] for g, _ in hits if g.startswith("policy"))
+    if data >= 2 and policy == 0:
+        return "DATA"
+    if policy >= 2 and data == 0:
+        return "POLICY"
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Semantic cache for intent classification
+# ---------------------------------------------------------------------------
+
+class _IntentSemanticCache:
+    """Cache of ``query embedding → intent label`` for the intent classifier.
+
+    Near-duplicate questions (cosine similarity ≥ ``threshold``) reuse a
+    previously classified label instead of paying for another LLM round-trip.
+    Entries are keyed by ``(normalised_query, llm_string)``, evicted LRU-first
+    once ``maxsize`` is reached, and expire after ``ttl`` seconds.
+
+    Embeddings are L2-normalised so inner product equals cosine similarity;
+    search uses ``faiss.IndexFlatIP`` when available, plain numpy otherwise.
+    """
+
+    def __init__(self, *, threshold: float = 0.9, maxsize: int = 512, ttl: float = 300.0):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, str], tuple[np.ndarray, str, float]] = OrderedDict()
+        self._keys: list[tuple[str, str]] = []
+        self._matrix: np.ndarray | None = None
+        self._index = None
+        self._dirty = False
+
+    @staticmethod
+    def normalise(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _expire(self, now: float) -> None:
+        stale = [k for k, (_, _, ts) in self._entries.items() if now - ts > self.ttl]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self._dirty = True
+
+    def _rebuild(self) -> None:
+        self._keys = list(self._entries)
+        if not self._keys:
+            self._matrix = None
+            self._index = None
+        else:
+            self._matrix = np.vstack([self._entries[k][0] for k in self._keys])
+            if faiss is not None:
+                self._index = faiss.IndexFlatIP(self._matrix.shape[1])
+                self._index.add(self._matrix)
+        self._dirty = False
+
+    def _nearest(self, vec: np.ndarray) -> tuple[float, int]:
+        if faiss is not None and self._index is not None:
+            scores, ids = self._index.search(vec.reshape(1, -1), 1)
+            return float(scores[0][0]), int(ids[0][0])
+        sims = self._matrix @ vec
+        idx = int(np.argmax(sims))
+        return float(sims[idx]), idx
+
+    def lookup(self, key: tuple[str, str], vec: np.ndarray) -> str | None:
+        """Return a cached label for *key* / *vec*, or ``None`` on miss."""
+        self._expire(time.monotonic())
+
+        hit = self._entries.get(key)
+        if hit is not None:
+            self._entries.move_to_end(key)
+            return hit[1]
+
+        if self._dirty:
+            self._rebuild()
+        if self._matrix is None:
+            return None
+
+        score, idx = self._nearest(vec)
+        if idx < 0 or score < self.threshold:
+            return None
+        match = self._keys[idx]
+        if match[1] != key[1] or match not in self._entries:
+            return None
+        self._entries.move_to_end(match)
+        return self._entries[match][1]
+
+    def add(self, key: tuple[str, str], vec: np.ndarray, label: str) -> None:
+        self._entries[key] = (vec, label, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+
+_intent_cache = _IntentSemanticCache()
+
+# Persistent semantic cache of policy answers, namespaced by index so a
+# re-indexed policy handbook starts with a fresh cache.
+_policy_cache = SemanticResponseCache(f"bank:{_BANK_INDEX_NAME}", threshold=0.95, ttl=3600)
+
+# Queries carrying customer identifiers are never cached
+_PII_RE = re.compile(r"\d{4,}|[\w.+-]+@[\w-]+\.[\w.]+|\bssn\b", re.IGNORECASE)
+
+# In-flight banking requests (query hash → shared result future)
+_inflight: dict[str, asyncio.Future[str]] = {}
+
 
 # ---------------------------------------------------------------------------
 # Token capture callback
@@ -106,12 +285,112 @@ class _TokenCapture(BaseCallbackHandler):
 
 
 async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> str:
-    """Answer a banking question using SQL, RAG policy search, or both."""
+    """Answer a banking question using SQL, RAG policy search, or both.
+
+    Concurrent calls with the same normalised query share one pipeline run.
+    """
+    key = hashlib.blake2b(
+        _IntentSemanticCache.normalise(query).encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+    shared = _inflight.get(key)
+    if shared is not None:
+        logger.debug("Banking query coalesced with in-flight request %s", key)
+        return await asyncio.shield(shared)
+
+    fut: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        result = await _answer(query)
+    except asyncio.CancelledError:
+        fut.cancel()
+        raise
+    except Exception as exc:
+        fut.set_exception(exc)
+        fut.exception()  # mark retrieved — there may be no other waiters
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
 
-    # Shared LLM for intent classification
-    llm = get_chat_llm(temperature=0.0, max_tokens=20, name="banking-intent-classifier")
 
+async def _answer(query: str) -> str:
+    """Classify *query*, run the matching sub-pipeline(s) and combine their sections."""
     # ── Step 1: Classify intent ─────────────────────────────────
+    intent = _keyword_intent(query)
+    cacheable = _PII_RE.search(query) is None
+    policy_task: asyncio.Task | None = None
+    if intent is None:
+        # The LLM classifier is needed — speculatively start the policy
+        # lookup so it overlaps the classifier round-trip.  POLICY, BOTH and
+        # GENERAL all use it; it is cancelled if the intent is DATA-only.
+        policy_task = asyncio.create_task(_query_policy(query, cacheable=cacheable))
+        try:
+            intent = await _classify_intent(query)
+        except BaseException:
+            policy_task.cancel()
+            raise
+
+    logger.info("Banking agent intent: %s for query: %s", intent, query[:80])
+
+    # ── Step 2: Execute the appropriate pipeline(s) ─────────────
+    tasks = []
+    if intent in ("DATA", "BOTH"):
+        tasks.append(("data", _query_sql(query)))
+    if intent in ("POLICY", "BOTH", "GENERAL"):
+        # GENERAL falls back to policy RAG
+        tasks.append(("policy", policy_task or _query_policy(query, cacheable=cacheable)))
+    elif policy_task is not None:
+        policy_task.cancel()
+
+    # The TaskGroup owns the sub-pipelines (structured concurrency)
+    async with asyncio.TaskGroup() as tg:
+        running = [tg.create_task(_run_section(label, coro)) for label, coro in tasks]
+
+    # ── Step 3: Combine results ─────────────────────────────────
+    return "\n\n---\n\n".join(task.result() for task in running)
+
+
+async def _run_section(label: str, coro) -> str:
+    """Await one sub-pipeline, turning a failure into an inline warning."""
+    try:
+        return await coro
+    except Exception as exc:
+        logger.error("Banking sub-task '%s' failed: %s", label, exc)
+        return f"⚠ {label} lookup encountered an error: {exc}"
+
+
+# ---------------------------------------------------------------------------
+# Intent classification
+# ---------------------------------------------------------------------------
+
+async def _classify_intent(query: str) -> str:
+    """Return DATA / POLICY / BOTH / GENERAL for a query with no clear keyword winner.
+
+    Callers try :func:`_keyword_intent` first; this consults the semantic
+    cache and, on a miss, the LLM classifier.
+    """
+    # Shared LLM for intent classification
+    llm = get_chat_llm(
+        temperature=0.0,
+        max_tokens=20,
+        name="banking-intent-classifier",
+        deployment=get_settings().azure_openai_mini_deployment,
+    )
+    key = (_IntentSemanticCache.normalise(query), llm.name)
+
+    vec = None
+    try:
+        vec = await embed_query(key[0])
+        cached = _intent_cache.lookup(key, vec)
+        if cached is not None:
+            logger.debug("Banking intent cache hit: %s", cached)
+            return cached
+    except Exception as exc:
+        logger.warning("Banking intent cache unavailable: %s", exc)
+
     intent_response = await llm.ainvoke([
         SystemMessage(content=_INTENT_PROMPT),
         HumanMessage(content=query),
@@ -126,60 +405,44 @@ async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> st
         intent = "DATA"
     elif "POLICY" in intent:
         intent = "POLICY"
+    elif "GENERAL" in intent:
+        intent = "GENERAL"
     else:
         intent = "BOTH"  # default to both when unsure
 
-    logger.info("Banking agent intent: %s for query: %s", intent, query[:80])
-
-    # ── Step 2: Execute the appropriate pipeline(s) ─────────────
-    tasks = []
-    if intent in ("DATA", "BOTH"):
-        tasks.append(("data", _query_sql(query)))
-    if intent in ("POLICY", "BOTH"):
-        tasks.append(("policy", _query_policy(query)))
-    if intent == "GENERAL":
-        tasks.append(("policy", _query_policy(query)))  # policy RAG as fallback
-
-    results = await asyncio.gather(
-        *[t for _, t in tasks],
-        return_exceptions=True,
-    )
-
-    # ── Step 3: Combine results ─────────────────────────────────
-    sections = []
-    for (label, _), result in zip(tasks, results):
-        if isinstance(result, Exception):
-            logger.error("Banking sub-task '%s' failed: %s", label, result)
-            sections.append(f"⚠ {label} lookup encountered an error: {result}")
-        else:
-            sections.append(result)
-
-    if len(sections) == 1:
-        return sections[0]
-
-    combined = "\n\n---\n\n".join(sections)
-    return combined
+    if vec is not None:
+        _intent_cache.add(key, vec, intent)
+    return intent
 
 
 # ---------------------------------------------------------------------------
 # SQL sub-agent
 # ---------------------------------------------------------------------------
 
-async def _query_sql(query: str) -> str:
-    """Run a natural-language SQL query against the banking database."""
-    llm = get_chat_llm(temperature=0.0, name="banking-sql-llm")
+@lru_cache(maxsize=4)
+def _get_sql_agent(name: str = "banking-sql-llm"):
+    """Build (once) the SQL agent executor; schema introspection happens here."""
+    llm = get_chat_llm(temperature=0.0, name=name)
 
-    toolkit = SQLDatabaseToolkit(db=_db, llm=llm)
+    toolkit = SQLDatabaseToolkit(db=_get_db(), llm=llm)
 
-    agent_executor = create_sql_agent(
+    return create_sql_agent(
         llm=llm,
         toolkit=toolkit,
         verbose=True,
         agent_type="openai-tools",
         handle_parsing_errors=True,
         prefix=_SQL_PREFIX,
+        top_k=5,
+        max_iterations=4,
+        early_stopping_method="force",
     )
 
+
+async def _query_sql(query: str) -> str:
+    """Run a natural-language SQL query against the banking database."""
+    agent_executor = _get_sql_agent()
+
     result = await agent_executor.ainvoke(
         {"input": query},
         config={"callbacks": [_TokenCapture()]},
@@ -191,19 +454,69 @@ async def _query_sql(query: str) -> str:
 # Policy RAG sub-agent
 # ---------------------------------------------------------------------------
 
-async def _query_policy(query: str) -> str:
-    """Search the bank policy index and return a grounded answer."""
-    vectorstore = get_vectorstore(_BANK_INDEX_NAME)
+class _LimitedRetriever(BaseRetriever):
+    """Run the wrapped retriever under :data:`_POLICY_SEARCH_LIMIT` (async path)."""
+
+    inner: BaseRetriever
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self.inner.invoke(query, config={"callbacks": run_manager.get_child()})
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        async with _POLICY_SEARCH_LIMIT:
+            return await self.inner.ainvoke(query, config={"callbacks": run_manager.get_child()})
+
+
+@lru_cache(maxsize=4)
+def _get_policy_chain(index_name: str = _BANK_INDEX_NAME) -> RetrievalQA:
+    """Build (once) the RetrievalQA chain over the policy index."""
+    vectorstore = get_vectorstore(index_name)
 
     llm = get_chat_llm(temperature=0.2, name="banking-policy-llm")
 
-    qa_chain = RetrievalQA.from_chain_type(
+    return RetrievalQA.from_chain_type(
         llm=llm,
         chain_type="stuff",
-        retriever=vectorstore.as_retriever(),
+        retriever=_LimitedRetriever(inner=vectorstore.as_retriever()),
         return_source_documents=True,
     )
 
+
+def _pick_title(meta: dict, position: int) -> str:
+    """Resolve a citation title from search metadata, falling back to position."""
+    return (
+        meta.get("title")
+        or meta.get("source")
+        or meta.get("chunk_id")
+        or meta.get("id")
+        or f"Document {position}"
+    )
+
+
+async def _query_policy(query: str, *, cacheable: bool = True) -> str:
+    """Search the bank policy index and return a grounded answer.
+
+    Answers (with citations) are served from the semantic cache when a
+    near-identical question was answered recently, unless *cacheable* is
+    ``False`` (e.g. the query contains customer identifiers).
+    """
+    vec = None
+    if cacheable:
+        try:
+            vec = await embed_query(query)
+            cached = await asyncio.to_thread(_policy_cache.lookup, vec)
+            if cached is not None:
+                logger.debug("Banking policy cache hit for query: %s", query[:80])
+                return cached
+        except Exception as exc:
+            logger.warning("Banking policy cache unavailable: %s", exc)
+
+    qa_chain = _get_policy_chain(_BANK_INDEX_NAME)
+
     result = await qa_chain.ainvoke(
         {"query": f"Based on the Enso National Bank policy handbook: {query}"},
         config={"callbacks": [_TokenCapture()]},
@@ -213,27 +526,24 @@ async def _query_policy(query: str) -> str:
     # Append citations
     source_docs = result.get("source_documents", [])
     if source_docs:
-        seen: set[str] = set()
-        citations: list[str] = []
+        # title → page of its first occurrence (dict keeps insertion order)
+        first_pages: dict[str, object] = {}
         for i, doc in enumerate(source_docs, 1):
             meta = doc.metadata or {}
-            title = (
-                meta.get("title")
-                or meta.get("source")
-                or meta.get("chunk_id")
-                or meta.get("id")
-                or f"Document {i}"
+            first_pages.setdefault(
+                _pick_title(meta, i), meta.get("page") or meta.get("page_number")
             )
-            if title in seen:
-                continue
-            seen.add(title)
-            parts = [f"**[{len(citations) + 1}]** {title}"]
-            page = meta.get("page") or meta.get("page_number")
-            if page is not None:
-                parts.append(f"Page: {page}")
-            citations.append(" — ".join(parts))
-
-        if citations:
-            answer += "\n\n---\n**Policy Citations:**\n" + "\n".join(citations)
+
+        citations = "\n".join(
+            f"**[{n}]** {title}" + (f" — Page: {page}" if page is not None else "")
+            for n, (title, page) in enumerate(first_pages.items(), 1)
+        )
+        answer += "\n\n---\n**Policy Citations:**\n" + citations
+
+    if vec is not None:
+        try:
+            await asyncio.to_thread(_policy_cache.store, query, vec, answer)
+        except Exception as exc:
+            logger.warning("Failed to cache banking policy answer: %s", exc)
 
     return answer
@@ -14,93 +14,256 @@ Authentication uses **DefaultAzureCredential** (role-based access).
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
+import io
 import logging
 import mimetypes
+import mmap
+import os
+import re
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
+from cachetools import LRUCache, TTLCache, cached
 from langchain_core.messages import HumanMessage, SystemMessage
 from langsmith import traceable
 
 from app.config import get_settings
 from app.utils.token_counter import add_tokens
-from app.utils.llm_cache import get_chat_llm, get_vectorstore
+from app.utils.llm_cache import apost_chat_completion, get_chat_llm, get_embeddings, get_vectorstore
+from app.utils.embedding_cache import cached_embed_query
+from app.utils.llm_response_cache import file_digest, get_or_compute, make_key
+from app.utils.llm_response_cache import get as cache_get, put as cache_put
+from app.utils import session_store
+from app.utils.openai_batch import chat_request_body, fetch_batch_results, submit_chat_batch
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
-_IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"}
-_DOC_EXTS = {".txt", ".md", ".pdf", ".csv", ".json", ".docx", ".xlsx"}
+_IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"})
+_DOC_EXTS = frozenset({".txt", ".md", ".pdf", ".csv", ".json", ".docx", ".xlsx"})
 
 # Hard-coded index name for insurance rules
 _CICP_INDEX_NAME = "cicp"
 
-# Per-session state tracking (session_id → dict of uploaded paths)
-# This allows the agent to remember across turns which files were already uploaded.
-_session_files: dict[str, dict[str, str | None]] = {}
+# Vision payloads: photos larger than this are downscaled to a long edge of
+# _VISION_MAX_EDGE px (JPEG q85) before base64 encoding.
+_VISION_RESIZE_MIN_BYTES = 200 * 1024
+_VISION_MAX_EDGE = 1024
+
+# Token budget for text extracted from uploaded documents.  PDF pages stop
+# being parsed once _MAX_DOC_CHARS (a safe upper bound) have been read.
+_MAX_DOC_TOKENS = 6000
+_MAX_DOC_CHARS = _MAX_DOC_TOKENS * 8
+
+# Per-section token budgets for the decision prompt
+_DECISION_TOKEN_BUDGETS = {"claim": 2000, "damage": 1500, "police": 1500, "rules": 3000}
+
+# Sub-task responses are cached per input; bump the version whenever a
+# prompt changes so stale responses are not served.
+_PROMPT_VERSION = "v1"
+_RESPONSE_CACHE_TTL = 86400  # seconds
+
+# Upper bound on the parallel extraction step so a stuck call cannot pin a turn
+_EXTRACTION_TIMEOUT = 60  # seconds
+
+# Per-session state (uploaded paths, police-report prompt flags, batch id)
+# lives in the shared session store so any worker can serve the next turn.
+# Idle sessions expire after an hour.
+_SESSION_TTL = 3600  # seconds
+
+
+def _session_key(session_id: str) -> str:
+    return f"cicp:session:{session_id}"
+
+
+async def _load_session(session_id: str) -> dict:
+    """Return the session's state, or a fresh one if none is stored."""
+    session = await session_store.get(_session_key(session_id))
+    if session is None:
+        session = {
+            "claim_form": None,
+            "damage_image": None,
+            "police_report": None,
+            "police_report_asked": False,
+            "police_report_skipped": False,
+        }
+    return session
+
+
+async def _save_session(session_id: str, session: dict) -> None:
+    """Persist the session's state, refreshing its TTL."""
+    await session_store.set(_session_key(session_id), session, ttl=_SESSION_TTL)
+
+
+async def _clear_session(session_id: str) -> None:
+    """Forget a session so the next claim starts fresh."""
+    await session_store.delete(_session_key(session_id))
+
+
+@lru_cache(maxsize=256)
+def _path_info(file_path: str) -> tuple[str, str]:
+    """Return ``(lower-cased suffix, mime type)`` for *file_path*."""
+    return (
+        Path(file_path).suffix.lower(),
+        mimetypes.guess_type(file_path)[0] or "image/png",
+    )
+
+
+def _is_image(file_path: str) -> bool:
+    return _path_info(file_path)[0] in _IMAGE_EXTS
+
+
+def _subtask_key(task: str, file_path: str) -> str:
+    """Response-cache key for a sub-task run on *file_path*.
+
+    Hashes the whole file, so async callers run it via ``asyncio.to_thread``.
+    """
+    return make_key(task, _PROMPT_VERSION, file_digest(file_path))
 
 
 # ---------------------------------------------------------------------------
 # Helper: encode image to base64
 # ---------------------------------------------------------------------------
 def _encode_image(image_path: str) -> tuple[str, str]:
-    """Read and base64-encode a local image; return (b64_string, mime_type)."""
-    path = Path(image_path)
-    mime_type = mimetypes.guess_type(str(path))[0] or "image/png"
-    with open(path, "rb") as fh:
-        b64 = base64.standard_b64encode(fh.read()).decode("utf-8")
+    """Read and base64-encode a local image; return (b64_string, mime_type).
+
+    Memoised on ``(path, mtime, size)`` so the same photo is encoded once
+    even when several sub-tasks (or a re-run) need it.
+    """
+    st = os.stat(image_path)
+    return _encode_image_cached(image_path, st.st_mtime_ns, st.st_size)
+
+
+# Encoded images are large, so fewer of them are kept than document texts
+@cached(LRUCache(maxsize=32), lock=threading.Lock())
+def _encode_image_cached(image_path: str, mtime_ns: int, size: int) -> tuple[str, str]:
+    mime_type = _path_info(image_path)[1]
+    if size == 0:
+        return "", mime_type
+    if size >= _VISION_RESIZE_MIN_BYTES:
+        prepared = _prep_image_for_vision(image_path)
+        if prepared is not None:
+            data, mime_type = prepared
+            return base64.b64encode(data).decode("ascii"), mime_type
+    # Encode straight from a read-only memory map — no intermediate bytes copy
+    with open(image_path, "rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            b64 = base64.b64encode(mm).decode("ascii")
     return b64, mime_type
 
 
+def _prep_image_for_vision(image_path: str) -> tuple[bytes, str] | None:
+    """Downscale a photo to the vision model's working size as JPEG.
+
+    Returns ``(jpeg_bytes, "image/jpeg")``, or ``None`` if Pillow is not
+    installed or the image cannot be decoded (caller sends the original).
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(image_path) as img:
+            img.thumbnail((_VISION_MAX_EDGE, _VISION_MAX_EDGE), Image.LANCZOS)
+            buf = io.BytesIO()
+            img.convert("RGB").save(buf, "JPEG", quality=85, optimize=True)
+    except Exception as exc:
+        logger.warning("CICP: could not downscale %s (%s); sending original", image_path, exc)
+        return None
+    return buf.getvalue(), "image/jpeg"
+
+
 # ---------------------------------------------------------------------------
 # Helper: read text from a document file
 # ---------------------------------------------------------------------------
 def _read_document(file_path: str) -> str:
-    """Extract text content from a document file."""
+    """Extract text content from a document file (first ``_MAX_DOC_TOKENS`` tokens).
+
+    Results are memoised on ``(path, mtime, size)`` because the same file
+    is read by several pipeline stages.
+    """
+    st = os.stat(file_path)
+    return _read_document_cached(file_path, st.st_mtime_ns, st.st_size)
+
+
+@cached(LRUCache(maxsize=128), lock=threading.Lock())
+def _read_document_cached(file_path: str, mtime_ns: int, size: int) -> str:
     path = Path(file_path)
-    ext = path.suffix.lower()
+    ext = _path_info(file_path)[0]
 
     if ext == ".pdf":
+        # Pages are read one at a time and parsing stops once the character
+        # budget is spent, so long PDFs are never materialised in full.
         try:
             import fitz  # PyMuPDF
-            doc = fitz.open(str(path))
-            text = "\n".join(page.get_text() for page in doc)
-            doc.close()
-            return text.strip() or "[PDF contained no extractable text]"
+            with fitz.open(str(path)) as doc:
+                text = _join_pages((page.get_text() for page in doc), _MAX_DOC_CHARS)
+            return _truncate_tokens(text.strip(), _MAX_DOC_TOKENS) or "[PDF contained no extractable text]"
         except ImportError:
             # Fallback: try pdfplumber
             try:
                 import pdfplumber
                 with pdfplumber.open(str(path)) as pdf:
-                    text = "\n".join(
-                        page.extract_text() or "" for page in pdf.pages
+                    text = _join_pages(
+                        (page.extract_text() or "" for page in pdf.pages), _MAX_DOC_CHARS
                     )
-                return text.strip() or "[PDF contained no extractable text]"
+                return _truncate_tokens(text.strip(), _MAX_DOC_TOKENS) or "[PDF contained no extractable text]"
             except ImportError:
                 return "[PDF reading requires PyMuPDF or pdfplumber — please install one]"
     else:
         # Plain text / CSV / JSON / Markdown / etc.
         try:
-            return path.read_text(encoding="utf-8", errors="replace")[:15000]
+            text = path.read_text(encoding="utf-8", errors="replace")
+            return _truncate_tokens(text, _MAX_DOC_TOKENS)
         except Exception as exc:
             return f"[Error reading file: {exc}]"
 
 
+def _join_pages(pages, budget: int) -> str:
+    """Join page texts with newlines, consuming *pages* only until *budget* chars."""
+    buf: list[str] = []
+    remaining = budget
+    for text in pages:
+        buf.append(text)
+        remaining -= len(text)
+        if remaining <= 0:
+            break
+    return "\n".join(buf)[:budget]
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model("gpt-4o")
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """Truncate *text* to at most *max_tokens* model tokens."""
+    if len(text) <= max_tokens:
+        # Every token spans at least one character
+        return text
+    enc = _get_encoding()
+    ids = enc.encode_ordinary(text)
+    if len(ids) <= max_tokens:
+        return text
+    return enc.decode(ids[:max_tokens])
+
+
 # ---------------------------------------------------------------------------
 # Sub-task 1: Extract claim details from the uploaded form
 # ---------------------------------------------------------------------------
-@traceable(name="cicp_extract_claim", run_type="chain", tags=["cicp"])
-async def _extract_claim_details(file_path: str) -> str:
-    """Use the LLM to extract structured claim details from a document or scanned image."""
-    llm = get_chat_llm(temperature=0.0, name="cicp-claim-extractor")
-
-    ext = Path(file_path).suffix.lower()
-    is_image_form = ext in _IMAGE_EXTS
-
-    system = SystemMessage(content="""\
+_SYS_CLAIM = SystemMessage(content="""\
 You are an insurance claim form analyst. Extract ALL relevant details from the \
 claim form provided below. Structure your output as follows:
 
@@ -123,81 +286,97 @@ claim form provided below. Structure your output as follows:
 If a field is not present in the form, write "Not provided".
 """)
 
-    if is_image_form:
+
+async def _claim_messages(file_path: str) -> list:
+    """Build the claim-extraction messages for a document or scanned image."""
+    if _is_image(file_path):
         # Scanned claim form — use vision to read the image
-        b64, mime = _encode_image(file_path)
-        logger.info("CICP: Reading scanned claim form via vision: %s", file_path)
+        b64, mime = await asyncio.to_thread(_encode_image, file_path)
+        logger.debug("CICP: Reading scanned claim form via vision: %s", file_path)
         human = HumanMessage(content=[
             {"type": "text", "text": "This is a scanned insurance claim form. Please read and extract all details from it."},
             {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}},
         ])
     else:
         # Text-based document
-        doc_text = _read_document(file_path)
-        logger.info("CICP: Extracted %d chars from claim form %s", len(doc_text), file_path)
+        doc_text = await asyncio.to_thread(_read_document, file_path)
+        logger.debug("CICP: Extracted %d chars from claim form %s", len(doc_text), file_path)
         human = HumanMessage(content=f"CLAIM FORM CONTENT:\n\n{doc_text}")
+    return [_SYS_CLAIM, human]
 
-    response = await llm.ainvoke([system, human])
-    add_tokens(response)
-    return response.content
+
+@traceable(name="cicp_extract_claim", run_type="chain", tags=["cicp"])
+async def _extract_claim_details(file_path: str) -> str:
+    """Use the LLM to extract structured claim details from a document or scanned image."""
+    llm = get_chat_llm(temperature=0.0, name="cicp-claim-extractor")
+
+    async def _call() -> str:
+        messages = await _claim_messages(file_path)
+        if _is_image(file_path):
+            response = await apost_chat_completion(messages, temperature=0.0)
+        else:
+            response = await llm.ainvoke(messages)
+        add_tokens(response)
+        return response.content
+
+    key = await asyncio.to_thread(_subtask_key, "cicp-claim", file_path)
+    return await get_or_compute(key, _call, ttl=_RESPONSE_CACHE_TTL)
 
 
 # ---------------------------------------------------------------------------
 # Sub-task 2: Analyse the damaged car image
 # ---------------------------------------------------------------------------
-@traceable(name="cicp_damage_assessment", run_type="chain", tags=["cicp"])
-async def _assess_damage(image_path: str) -> str:
-    """Use Azure OpenAI vision to assess car damage from a photo."""
-    llm = get_chat_llm(temperature=0.2, name="cicp-damage-assessor")
-
-    b64, mime = _encode_image(image_path)
-    logger.info("CICP: Analysing damage image %s (%s)", image_path, mime)
+_DAMAGE_PROMPT = (
+    "You are an expert automotive damage assessor for an insurance company. "
+    "Analyse this car damage photo and provide a detailed assessment:\n\n"
+    "## Damage Assessment\n"
+    "- **Damage Severity**: (Minor / Moderate / Severe / Total Loss)\n"
+    "- **Affected Areas**: List all damaged parts (bumper, hood, fender, door, "
+    "windshield, etc.)\n"
+    "- **Type of Damage**: (Dent, scratch, crack, crush, shatter, etc.)\n"
+    "- **Estimated Repair Complexity**: (Simple repair / Panel replacement / "
+    "Major structural / Uneconomical to repair)\n"
+    "- **Visible Safety Concerns**: (Airbag deployment, structural deformation, "
+    "fluid leaks, etc.)\n"
+    "- **Consistency Notes**: Does the damage appear consistent with a typical "
+    "collision? Any signs of pre-existing damage or tampering?\n"
+    "- **Estimated Repair Cost Range**: Provide a rough USD range.\n\n"
+    "Be thorough and factual."
+)
+
+
+async def _damage_messages(image_path: str) -> list:
+    """Build the vision messages for the damage assessment."""
+    b64, mime = await asyncio.to_thread(_encode_image, image_path)
+    logger.debug("CICP: Analysing damage image %s (%s)", image_path, mime)
 
     content_parts = [
-        {
-            "type": "text",
-            "text": (
-                "You are an expert automotive damage assessor for an insurance company. "
-                "Analyse this car damage photo and provide a detailed assessment:\n\n"
-                "## Damage Assessment\n"
-                "- **Damage Severity**: (Minor / Moderate / Severe / Total Loss)\n"
-                "- **Affected Areas**: List all damaged parts (bumper, hood, fender, door, "
-                "windshield, etc.)\n"
-                "- **Type of Damage**: (Dent, scratch, crack, crush, shatter, etc.)\n"
-                "- **Estimated Repair Complexity**: (Simple repair / Panel replacement / "
-                "Major structural / Uneconomical to repair)\n"
-                "- **Visible Safety Concerns**: (Airbag deployment, structural deformation, "
-                "fluid leaks, etc.)\n"
-                "- **Consistency Notes**: Does the damage appear consistent with a typical "
-                "collision? Any signs of pre-existing damage or tampering?\n"
-                "- **Estimated Repair Cost Range**: Provide a rough USD range.\n\n"
-                "Be thorough and factual."
-            ),
-        },
+        {"type": "text", "text": _DAMAGE_PROMPT},
         {
             "type": "image_url",
             "image_url": {"url": f"data:{mime};base64,{b64}"},
         },
     ]
+    return [HumanMessage(content=content_parts)]
 
-    message = HumanMessage(content=content_parts)
-    response = await llm.ainvoke([message])
-    add_tokens(response)
-    return response.content
+
+@traceable(name="cicp_damage_assessment", run_type="chain", tags=["cicp"])
+async def _assess_damage(image_path: str) -> str:
+    """Use Azure OpenAI vision to assess car damage from a photo."""
+
+    async def _call() -> str:
+        response = await apost_chat_completion(await _damage_messages(image_path), temperature=0.2)
+        add_tokens(response)
+        return response.content
+
+    key = await asyncio.to_thread(_subtask_key, "cicp-damage", image_path)
+    return await get_or_compute(key, _call, ttl=_RESPONSE_CACHE_TTL)
 
 
 # ---------------------------------------------------------------------------
 # Sub-task 3: Extract police report details
 # ---------------------------------------------------------------------------
-@traceable(name="cicp_police_report", run_type="chain", tags=["cicp"])
-async def _extract_police_report(file_path: str) -> str:
-    """Use the LLM to extract key details from a police/incident report."""
-    llm = get_chat_llm(temperature=0.0, name="cicp-police-report-extractor")
-
-    ext = Path(file_path).suffix.lower()
-    is_image_report = ext in _IMAGE_EXTS
-
-    system = SystemMessage(content="""\
+_SYS_POLICE = SystemMessage(content="""\
 You are an insurance claims analyst reviewing a police/incident report. \
 Extract ALL relevant details from the report. Structure your output as follows:
 
@@ -220,21 +399,39 @@ Extract ALL relevant details from the report. Structure your output as follows:
 If a field is not present in the report, write "Not provided".
 """)
 
-    if is_image_report:
-        b64, mime = _encode_image(file_path)
-        logger.info("CICP: Reading scanned police report via vision: %s", file_path)
+
+async def _police_messages(file_path: str) -> list:
+    """Build the police-report extraction messages for a document or scanned image."""
+    if _is_image(file_path):
+        b64, mime = await asyncio.to_thread(_encode_image, file_path)
+        logger.debug("CICP: Reading scanned police report via vision: %s", file_path)
         human = HumanMessage(content=[
             {"type": "text", "text": "This is a scanned police/incident report. Please read and extract all details from it."},
             {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}},
         ])
     else:
-        doc_text = _read_document(file_path)
-        logger.info("CICP: Extracted %d chars from police report %s", len(doc_text), file_path)
+        doc_text = await asyncio.to_thread(_read_document, file_path)
+        logger.debug("CICP: Extracted %d chars from police report %s", len(doc_text), file_path)
         human = HumanMessage(content=f"POLICE REPORT CONTENT:\n\n{doc_text}")
+    return [_SYS_POLICE, human]
 
-    response = await llm.ainvoke([system, human])
-    add_tokens(response)
-    return response.content
+
+@traceable(name="cicp_police_report", run_type="chain", tags=["cicp"])
+async def _extract_police_report(file_path: str) -> str:
+    """Use the LLM to extract key details from a police/incident report."""
+    llm = get_chat_llm(temperature=0.0, name="cicp-police-report-extractor")
+
+    async def _call() -> str:
+        messages = await _police_messages(file_path)
+        if _is_image(file_path):
+            response = await apost_chat_completion(messages, temperature=0.0)
+        else:
+            response = await llm.ainvoke(messages)
+        add_tokens(response)
+        return response.content
+
+    key = await asyncio.to_thread(_subtask_key, "cicp-police", file_path)
+    return await get_or_compute(key, _call, ttl=_RESPONSE_CACHE_TTL)
 
 
 # ---------------------------------------------------------------------------
@@ -244,23 +441,82 @@ If a field is not present in the report, write "Not provided".
 async def _lookup_rules(claim_summary: str, damage_summary: str) -> str:
     """Search the 'cicp' Azure AI Search index for applicable rules."""
 
-    vectorstore = get_vectorstore(_CICP_INDEX_NAME)
-
-    # Build a focused search query combining claim + damage info
+    # Build a focused search query from the fields that matter for rule matching
     search_query = (
-        f"Insurance claim rules for: {claim_summary[:500]} "
-        f"Damage assessment: {damage_summary[:500]}"
+        f"Insurance claim rules for: {_distill_for_search(claim_summary)} "
+        f"Damage assessment: {_distill_for_search(damage_summary)}"
     )
+    return await _search_rules(search_query)
+
+
+_SEARCH_FIELD_RE = re.compile(
+    r"^[\s#*-]*(Incident Description|Damage Severity|Affected Areas|Type of Damage)\**\s*:\s*(.+)$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_MARKDOWN_RE = re.compile(r"\*\*|^#+\s*|^\s*-\s+", re.MULTILINE)
+_SEARCH_FALLBACK_WORDS = 100
+
+
+def _distill_for_search(text: str) -> str:
+    """Reduce an extraction summary to the fields worth embedding.
+
+    Keeps the incident description, damage severity, affected areas and
+    damage type; falls back to the first words of the summary, stripped
+    of markdown and "Not provided" lines, when none of those are present.
+    """
+    fields = [
+        f"{label}: {value.strip(' *')}"
+        for label, value in _SEARCH_FIELD_RE.findall(text)
+        if not value.strip(" *").lower().startswith("not provided")
+    ]
+    if fields:
+        return " ".join(fields)
+    lines = [
+        line for line in _MARKDOWN_RE.sub("", text).splitlines()
+        if line.strip() and not line.rstrip(" .").lower().endswith("not provided")
+    ]
+    return " ".join(" ".join(lines).split()[:_SEARCH_FALLBACK_WORDS])
+
+
+@traceable(name="cicp_rules_lookup_raw", run_type="chain", tags=["cicp"])
+async def _lookup_rules_raw(text: str) -> str:
+    """Search for applicable rules from a raw text blob (e.g. unparsed claim form).
+
+    Used speculatively, before LLM extraction has produced summaries.
+    """
+    return await _search_rules(f"Insurance claim rules for: {text}")
+
+
+def _rules_found(rules: str) -> bool:
+    """True when a rules lookup returned matches (not a ``[No matching …]``/error note)."""
+    return bool(rules) and not rules.startswith("[")
+
+
+# Formatted search results, keyed on the normalised query text — repeat
+# claims skip the index round-trip.  Query embeddings go through the shared
+# embedding cache.
+_rules_result_cache: TTLCache[str, str] = TTLCache(maxsize=512, ttl=3600)
+
 
-    logger.info("CICP: Searching '%s' index for applicable rules", _CICP_INDEX_NAME)
+async def _search_rules(search_query: str) -> str:
+    """Run *search_query* against the 'cicp' index and format the matched rules."""
+    key = hashlib.sha1(" ".join(search_query.lower().split()).encode("utf-8")).hexdigest()
+    cached_rules = _rules_result_cache.get(key)
+    if cached_rules is not None:
+        return cached_rules
+
+    vectorstore = get_vectorstore(_CICP_INDEX_NAME)
+
+    logger.debug("CICP: Searching '%s' index for applicable rules", _CICP_INDEX_NAME)
 
     try:
-        retriever = vectorstore.as_retriever()
-        docs = await retriever.ainvoke(search_query)
+        vec = await asyncio.to_thread(cached_embed_query, get_embeddings(), search_query)
+        docs = await asyncio.to_thread(vectorstore.similarity_search_by_vector, vec, k=5)
         if docs:
             rules_text = "\n\n---\n\n".join(
                 f"**Rule {i+1}:**\n{doc.page_content}" for i, doc in enumerate(docs)
             )
+            _rules_result_cache[key] = rules_text
             return rules_text
         else:
             return "[No matching rules found in the cicp index]"
@@ -272,51 +528,38 @@ async def _lookup_rules(claim_summary: str, damage_summary: str) -> str:
 # ---------------------------------------------------------------------------
 # Sub-task 5: Final decision — APPROVE or REJECT with reasoning
 # ---------------------------------------------------------------------------
-@traceable(name="cicp_decision", run_type="chain", tags=["cicp"])
-async def _make_decision(
-    claim_details: str,
-    damage_assessment: str,
-    police_report: str | None,
-    rules: str,
-    original_query: str,
-) -> str:
-    """Synthesise everything and render a final APPROVE / REJECT decision."""
-    llm = get_chat_llm(temperature=0.1, name="cicp-decision-maker")
-
-    police_instruction = ""
-    if police_report:
-        police_instruction = (
-            "A police report has been provided. You MUST perform a mandatory "
-            "cross-verification between the claim form and the police report BEFORE "
-            "making any decision. Compare the following fields carefully:\n\n"
-            "MANDATORY CROSS-VERIFICATION CHECKLIST:\n"
-            "- **VIN (Vehicle Identification Number)**: Must match EXACTLY between claim form and police report. "
-            "ANY mismatch = automatic REJECTION (possible fraud).\n"
-            "- **Vehicle Make/Model/Year**: Must be consistent.\n"
-            "- **License Plate Number**: Must match if present in both.\n"
-            "- **Claimant Name vs. Parties Involved**: The claimant must appear in the police report.\n"
-            "- **Incident Date & Time**: Must be consistent between documents.\n"
-            "- **Incident Location**: Must be consistent.\n"
-            "- **Incident Description**: The accounts should be broadly consistent. "
-            "Major contradictions are a red flag.\n"
-            "- **Injuries Reported**: Should align.\n\n"
-            "⚠️ CRITICAL: If the VIN in the claim form does NOT match the VIN in the "
-            "police report, you MUST REJECT the claim immediately and cite the VIN mismatch "
-            "as the primary reason. This is a strong indicator of fraud or filing error.\n\n"
-            "List ALL discrepancies found in the Analysis section, even minor ones."
-        )
-    else:
-        police_instruction = (
-            "⚠️ NO POLICE REPORT WAS PROVIDED. This is a critical factor. "
-            "Apply the applicable insurance policy rules regarding claims without "
-            "a police report. Many policies require a police report for claims "
-            "above a certain threshold or for specific incident types (e.g., theft, "
-            "hit-and-run, multi-vehicle). If the rules mandate a police report for "
-            "this type of claim, this should heavily influence your decision toward "
-            "REJECTION or conditional approval pending the report."
-        )
-
-    system = SystemMessage(content=f"""\
+_POLICE_PROVIDED_INSTRUCTION = (
+    "A police report has been provided. You MUST perform a mandatory "
+    "cross-verification between the claim form and the police report BEFORE "
+    "making any decision. Compare the following fields carefully:\n\n"
+    "MANDATORY CROSS-VERIFICATION CHECKLIST:\n"
+    "- **VIN (Vehicle Identification Number)**: Must match EXACTLY between claim form and police report. "
+    "ANY mismatch = automatic REJECTION (possible fraud).\n"
+    "- **Vehicle Make/Model/Year**: Must be consistent.\n"
+    "- **License Plate Number**: Must match if present in both.\n"
+    "- **Claimant Name vs. Parties Involved**: The claimant must appear in the police report.\n"
+    "- **Incident Date & Time**: Must be consistent between documents.\n"
+    "- **Incident Location**: Must be consistent.\n"
+    "- **Incident Description**: The accounts should be broadly consistent. "
+    "Major contradictions are a red flag.\n"
+    "- **Injuries Reported**: Should align.\n\n"
+    "⚠️ CRITICAL: If the VIN in the claim form does NOT match the VIN in the "
+    "police report, you MUST REJECT the claim immediately and cite the VIN mismatch "
+    "as the primary reason. This is a strong indicator of fraud or filing error.\n\n"
+    "List ALL discrepancies found in the Analysis section, even minor ones."
+)
+
+_POLICE_MISSING_INSTRUCTION = (
+    "⚠️ NO POLICE REPORT WAS PROVIDED. This is a critical factor. "
+    "Apply the applicable insurance policy rules regarding claims without "
+    "a police report. Many policies require a police report for claims "
+    "above a certain threshold or for specific incident types (e.g., theft, "
+    "hit-and-run, multi-vehicle). If the rules mandate a police report for "
+    "this type of claim, this should heavily influence your decision toward "
+    "REJECTION or conditional approval pending the report."
+)
+
+_DECISION_TEMPLATE = """\
 You are a senior insurance claims adjudicator. Based on the claim form details, \
 the damage assessment report, the police report (if available), and the applicable \
 insurance policy rules, render a final decision.
@@ -366,22 +609,105 @@ can do if rejected — e.g., "Submit a police report within 30 days")
 ---
 
 Be fair, thorough, and cite specific rules where applicable.
-""")
+"""
 
+# Two fixed variants so each call sends a byte-identical system prompt
+# (lets the service reuse its prompt-prefix cache).
+_SYS_DECISION_WITH_POLICE = SystemMessage(
+    content=_DECISION_TEMPLATE.format(police_instruction=_POLICE_PROVIDED_INSTRUCTION)
+)
+_SYS_DECISION_NO_POLICE = SystemMessage(
+    content=_DECISION_TEMPLATE.format(police_instruction=_POLICE_MISSING_INSTRUCTION)
+)
+
+
+@traceable(name="cicp_decision", run_type="chain", tags=["cicp"])
+async def _make_decision(
+    claim_details: str,
+    damage_assessment: str,
+    police_report: str | None,
+    rules: str,
+    original_query: str,
+) -> str:
+    """Synthesise everything and render a final APPROVE / REJECT decision."""
+    llm = get_chat_llm(temperature=0.1, name="cicp-decision-maker")
+    system = _SYS_DECISION_WITH_POLICE if police_report else _SYS_DECISION_NO_POLICE
+
+    budgets = _DECISION_TOKEN_BUDGETS
     human_content = (
         f"## Original User Request\n{original_query}\n\n"
-        f"## Claim Form Details\n{claim_details}\n\n"
-        f"## Damage Assessment\n{damage_assessment}\n\n"
+        f"## Claim Form Details\n{_truncate_tokens(claim_details, budgets['claim'])}\n\n"
+        f"## Damage Assessment\n{_truncate_tokens(damage_assessment, budgets['damage'])}\n\n"
     )
     if police_report:
-        human_content += f"## Police Report Details\n{police_report}\n\n"
+        human_content += f"## Police Report Details\n{_truncate_tokens(police_report, budgets['police'])}\n\n"
     else:
         human_content += "## Police Report\n⚠️ **Not provided by claimant.**\n\n"
-    human_content += f"## Applicable Insurance Rules\n{rules}"
+    human_content += f"## Applicable Insurance Rules\n{_truncate_tokens(rules, budgets['rules'])}"
+
+    async def _call() -> str:
+        response = await llm.ainvoke([system, HumanMessage(content=human_content)])
+        add_tokens(response)
+        return response.content
 
-    response = await llm.ainvoke([system, HumanMessage(content=human_content)])
-    add_tokens(response)
-    return response.content
+    # Decision is a pure function of the summaries it is given
+    key = make_key("cicp-decision", _PROMPT_VERSION, human_content)
+    return await get_or_compute(key, _call, ttl=_RESPONSE_CACHE_TTL)
+
+
+# ---------------------------------------------------------------------------
+# Deterministic rejection: VIN mismatch between claim form and police report
+# ---------------------------------------------------------------------------
+# Only an explicitly labelled field counts ("VIN: …", "**VIN Number:** …");
+# the value is 17 characters, never I / O / Q, with at least one digit.
+_VIN_FIELD_RE = re.compile(
+    r"(?i:\bVIN\b)[*_ \t]*(?i:number|no\.?|#)?[*_ \t]*:[*_ \t]*"
+    r"((?=[A-HJ-NPR-Z]*[0-9])[A-HJ-NPR-Z0-9]{17})\b"
+)
+
+
+def _extract_vin(text: str) -> str | None:
+    """Return the VIN from *text*'s labelled "VIN:" field.
+
+    ``None`` unless exactly one distinct labelled VIN is present — case or
+    report numbers and multi-vehicle reports must not trigger a rejection.
+    """
+    vins = set(_VIN_FIELD_RE.findall(text))
+    return vins.pop() if len(vins) == 1 else None
+
+
+def _vin_mismatch_report(
+    claim_details: str,
+    damage_assessment: str,
+    police_report: str,
+    rules: str,
+    claim_vin: str,
+    police_vin: str,
+) -> str:
+    """Render the decision report for a VIN mismatch (same structure as the LLM's)."""
+    return (
+        "---\n\n"
+        "# 🚗 Car Insurance Claim — Decision Report\n\n"
+        f"## 1. Claim Summary\n{claim_details}\n\n"
+        f"## 2. Damage Assessment Summary\n{damage_assessment}\n\n"
+        f"## 3. Police Report Summary\n{police_report}\n\n"
+        f"## 4. Applicable Rules & Policy Provisions\n{rules}\n\n"
+        "## 5. Cross-Verification Results\n"
+        f"- **VIN**: ❌ MISMATCH — claim form `{claim_vin}` vs. police report `{police_vin}`\n"
+        "- Remaining fields were not evaluated: the VIN mismatch alone is decisive.\n\n"
+        "## 6. Analysis\n"
+        "The Vehicle Identification Number on the claim form does not match the "
+        "VIN recorded in the police report. Policy requires the VIN to match "
+        "exactly across both documents; a mismatch is a strong indicator of "
+        "fraud or a filing error and mandates rejection.\n\n"
+        "## 7. Decision\n\n"
+        "**DECISION: ❌ REJECTED**\n\n"
+        f"**Reason**: VIN mismatch between the claim form ({claim_vin}) and the "
+        f"police report ({police_vin}).\n\n"
+        "**Conditions / Next Steps**: If this is a filing error, submit a corrected "
+        "claim form or police report showing the correct VIN for re-evaluation.\n\n"
+        "---"
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -422,6 +748,39 @@ _SKIP_POLICE_HINTS = {
 }
 
 
+
+def _compile_hints(hints: set[str]):
+    """Compile a hint set into one matcher built once at import time.
+
+    Uses a pyahocorasick automaton when installed, otherwise a single regex
+    alternation — either way one pass over the message replaces a Python
+    loop of substring scans.
+    """
+    try:
+        import ahocorasick
+    except ImportError:
+        ordered = sorted(hints, key=len, reverse=True)
+        return re.compile("|".join(map(re.escape, ordered)))
+    automaton = ahocorasick.Automaton()
+    for hint in hints:
+        automaton.add_word(hint, hint)
+    automaton.make_automaton()
+    return automaton
+
+
+def _has_hint(matcher, q: str) -> bool:
+    """True if any compiled hint occurs as a substring of *q*."""
+    if isinstance(matcher, re.Pattern):
+        return matcher.search(q) is not None
+    return next(matcher.iter(q), None) is not None
+
+
+_CLAIM_MATCHER = _compile_hints(_CLAIM_FORM_HINTS)
+_DAMAGE_MATCHER = _compile_hints(_DAMAGE_PHOTO_HINTS)
+_POLICE_MATCHER = _compile_hints(_POLICE_REPORT_HINTS)
+_SKIP_MATCHER = _compile_hints(_SKIP_POLICE_HINTS)
+
+
 def _classify_upload(file_path: str, query: str) -> str | None:
     """Determine whether the uploaded file is a 'claim_form', 'damage_image', or 'police_report'.
 
@@ -430,16 +789,16 @@ def _classify_upload(file_path: str, query: str) -> str | None:
     images (JPG/PNG) correctly.
     """
     q = query.lower().strip()
-    ext = Path(file_path).suffix.lower()
+    ext = _path_info(file_path)[0]
     is_image = ext in _IMAGE_EXTS
     is_doc = ext in _DOC_EXTS
 
     # 1. Check user message for explicit intent
-    if any(hint in q for hint in _POLICE_REPORT_HINTS):
+    if _has_hint(_POLICE_MATCHER, q):
         return "police_report"
-    if any(hint in q for hint in _CLAIM_FORM_HINTS):
+    if _has_hint(_CLAIM_MATCHER, q):
         return "claim_form"
-    if any(hint in q for hint in _DAMAGE_PHOTO_HINTS):
+    if _has_hint(_DAMAGE_MATCHER, q):
         return "damage_image"
 
     # 2. Fallback: non-image documents are almost always claim forms
@@ -454,6 +813,114 @@ def _classify_upload(file_path: str, query: str) -> str | None:
     return None
 
 
+# ---------------------------------------------------------------------------
+# Batch mode: queue the extraction sub-tasks as one Batch API job
+# ---------------------------------------------------------------------------
+_BATCH_POLL_INTERVAL = 60  # seconds
+
+# Strong references to the background pollers so they are not GC'd mid-run
+_batch_pollers: set[asyncio.Task] = set()
+
+
+def _pending_subtasks(session: dict) -> dict[str, tuple[str, Callable[[str], Awaitable[list]], str, float]]:
+    """Return ``custom_id → (cache key, message builder, path, temperature)``
+    for every sub-task whose response is not cached yet."""
+    specs = [
+        ("claim", "cicp-claim", _claim_messages, session["claim_form"], 0.0),
+        ("damage", "cicp-damage", _damage_messages, session["damage_image"], 0.2),
+    ]
+    if session["police_report"]:
+        specs.append(("police", "cicp-police", _police_messages, session["police_report"], 0.0))
+
+    pending = {}
+    for custom_id, task, build, path, temperature in specs:
+        key = _subtask_key(task, path)
+        if cache_get(key) is None:
+            pending[custom_id] = (key, build, path, temperature)
+    return pending
+
+
+def _store_batch_results(keys: dict[str, str], results: dict[str, dict]) -> None:
+    """Write completed batch responses into the sub-task response cache."""
+    for custom_id, body in results.items():
+        key = keys.get(custom_id)
+        if key is not None:
+            cache_put(key, body["choices"][0]["message"]["content"], _RESPONSE_CACHE_TTL)
+
+
+async def _poll_batch(batch_id: str, keys: dict[str, str]) -> None:
+    """Background worker: wait for *batch_id* and warm the response cache."""
+    while True:
+        await asyncio.sleep(_BATCH_POLL_INTERVAL)
+        try:
+            results = await fetch_batch_results(batch_id)
+        except Exception:
+            logger.exception("CICP: Batch %s failed", batch_id)
+            return
+        if results is not None:
+            await asyncio.to_thread(_store_batch_results, keys, results)
+            logger.info("CICP: Batch %s completed", batch_id)
+            return
+
+
+async def _run_batch_mode(session: dict) -> str | None:
+    """Submit or check the session's batch job.
+
+    Returns a status message while results are outstanding, or ``None``
+    once every sub-task is cached and the pipeline can run.
+    """
+    pending = await asyncio.to_thread(_pending_subtasks, session)
+    batch_keys = session.get("batch_keys") or {}
+    if not pending:
+        session.pop("batch_id", None)
+        session.pop("batch_keys", None)
+        return None
+
+    batch_id = session.get("batch_id")
+    if batch_id and all(batch_keys.get(cid) == spec[0] for cid, spec in pending.items()):
+        try:
+            results = await fetch_batch_results(batch_id)
+        except RuntimeError as exc:
+            # Fall back to the interactive path rather than leaving the claim stuck
+            logger.warning("CICP: %s — processing interactively", exc)
+            session.pop("batch_id", None)
+            session.pop("batch_keys", None)
+            return None
+        if results is None:
+            return (
+                "## 🚗 CICP — Claim Still Processing ⏳\n\n"
+                f"Your claim (batch `{batch_id}`) is still being processed. "
+                "Results are usually ready within a few hours and at most 24 hours.\n\n"
+                "Send another message later to get your decision."
+            )
+        await asyncio.to_thread(_store_batch_results, batch_keys, results)
+        session.pop("batch_id", None)
+        session.pop("batch_keys", None)
+        return None
+
+    requests = {
+        cid: chat_request_body(await build(path), temperature=temperature)
+        for cid, (_, build, path, temperature) in pending.items()
+    }
+    batch_id = await submit_chat_batch(requests)
+    keys = {cid: spec[0] for cid, spec in pending.items()}
+    session["batch_id"] = batch_id
+    session["batch_keys"] = keys
+
+    poller = asyncio.create_task(_poll_batch(batch_id, keys))
+    _batch_pollers.add(poller)
+    poller.add_done_callback(_batch_pollers.discard)
+
+    logger.info("CICP: Queued %d sub-task(s) as batch %s", len(requests), batch_id)
+    return (
+        "## 🚗 CICP — Claim Queued for Batch Processing ⏳\n\n"
+        f"Your claim files have been submitted for processing (batch `{batch_id}`). "
+        "Results are usually ready within a few hours and at most 24 hours.\n\n"
+        "Send any message (e.g. *\"Check my claim status\"*) to get the "
+        "final decision once it's ready."
+    )
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -473,39 +940,50 @@ async def invoke(
     2. If claim form + damage photo present → asks for police report (or skip).
     3. Once ready → runs the full pipeline.
     4. If police report is skipped → applies rules and may reject.
+
+    With ``CICP_BATCH_MODE`` enabled the extraction sub-tasks are queued as
+    a single Batch API job; follow-up messages check on it and resume the
+    pipeline once the results are in.
     """
-    # ── Initialise session state ────────────────────────────────
-    if session_id not in _session_files:
-        _session_files[session_id] = {
-            "claim_form": None,
-            "damage_image": None,
-            "police_report": None,
-            "police_report_asked": False,
-            "police_report_skipped": False,
-        }
+    session = await _load_session(session_id)
+    try:
+        return await _run_turn(query, session, session_id, file_path)
+    finally:
+        # An emptied session means the claim was processed — start fresh next time
+        if session:
+            await _save_session(session_id, session)
+        else:
+            await _clear_session(session_id)
 
-    session = _session_files[session_id]
+
+async def _run_turn(
+    query: str,
+    session: dict,
+    session_id: str,
+    file_path: Optional[str],
+) -> str:
+    """Advance *session* by one user turn and return the reply; see :func:`invoke`."""
     q = query.lower().strip()
 
     # ── Check if user wants to skip police report ───────────────
     if session.get("police_report_asked") and not session.get("police_report_skipped"):
-        if not file_path and any(hint in q for hint in _SKIP_POLICE_HINTS):
+        if not file_path and _has_hint(_SKIP_MATCHER, q):
             session["police_report_skipped"] = True
-            logger.info("CICP: User opted to skip police report")
+            logger.debug("CICP: User opted to skip police report")
 
     # ── Classify the current upload (if any) ────────────────────
     if file_path:
         ftype = _classify_upload(file_path, query)
         if ftype == "claim_form":
             session["claim_form"] = file_path
-            logger.info("CICP: Claim form uploaded → %s", file_path)
+            logger.debug("CICP: Claim form uploaded → %s", file_path)
         elif ftype == "damage_image":
             session["damage_image"] = file_path
-            logger.info("CICP: Damage image uploaded → %s", file_path)
+            logger.debug("CICP: Damage image uploaded → %s", file_path)
         elif ftype == "police_report":
             session["police_report"] = file_path
-            logger.info("CICP: Police report uploaded → %s", file_path)
-        elif ftype is None and Path(file_path).suffix.lower() in _IMAGE_EXTS:
+            logger.debug("CICP: Police report uploaded → %s", file_path)
+        elif ftype is None and _is_image(file_path):
             # Ambiguous image — stash it and ask the user
             session["_last_ambiguous_image"] = file_path
             fname = Path(file_path).name
@@ -525,18 +1003,18 @@ async def invoke(
     if not file_path:
         last_ambiguous = session.get("_last_ambiguous_image")
         if last_ambiguous:
-            if any(hint in q for hint in _POLICE_REPORT_HINTS):
+            if _has_hint(_POLICE_MATCHER, q):
                 session["police_report"] = last_ambiguous
                 session.pop("_last_ambiguous_image", None)
-                logger.info("CICP: User clarified image as police report → %s", last_ambiguous)
-            elif any(hint in q for hint in _CLAIM_FORM_HINTS):
+                logger.debug("CICP: User clarified image as police report → %s", last_ambiguous)
+            elif _has_hint(_CLAIM_MATCHER, q):
                 session["claim_form"] = last_ambiguous
                 session.pop("_last_ambiguous_image", None)
-                logger.info("CICP: User clarified image as claim form → %s", last_ambiguous)
-            elif any(hint in q for hint in _DAMAGE_PHOTO_HINTS):
+                logger.debug("CICP: User clarified image as claim form → %s", last_ambiguous)
+            elif _has_hint(_DAMAGE_MATCHER, q):
                 session["damage_image"] = last_ambiguous
                 session.pop("_last_ambiguous_image", None)
-                logger.info("CICP: User clarified image as damage photo → %s", last_ambiguous)
+                logger.debug("CICP: User clarified image as damage photo → %s", last_ambiguous)
 
     has_claim_form = session["claim_form"] is not None
     has_damage_image = session["damage_image"] is not None
@@ -607,7 +1085,8 @@ async def invoke(
 
     # ── All files ready (or police report skipped) → run pipeline ──
     police_status = "provided" if has_police_report else "SKIPPED"
-    logger.info(
+    started = time.perf_counter()
+    logger.debug(
         "CICP: Running full pipeline (form=%s, image=%s, police=%s)",
         session["claim_form"],
         session["damage_image"],
@@ -615,43 +1094,83 @@ async def invoke(
     )
 
     try:
-        import asyncio
-
-        # Step 1, 2 (& 3 if police report provided) run in parallel
-        tasks = [
-            _extract_claim_details(session["claim_form"]),
-            _assess_damage(session["damage_image"]),
-        ]
-        if has_police_report:
-            tasks.append(_extract_police_report(session["police_report"]))
-
-        results = await asyncio.gather(*tasks)
-
-        claim_details = results[0]
-        damage_assessment = results[1]
-        police_report_details = results[2] if has_police_report else None
-
-        # Step 4: Look up rules using combined context
-        rules = await _lookup_rules(claim_details, damage_assessment)
-
-        # Step 5: Final decision
-        decision = await _make_decision(
-            claim_details,
-            damage_assessment,
-            police_report_details,
-            rules,
-            query,
-        )
+        if get_settings().cicp_batch_mode:
+            status = await _run_batch_mode(session)
+            if status is not None:
+                return status
+
+        # Speculatively look up rules from the raw claim-form text so the
+        # search overlaps the extraction calls instead of following them.
+        speculative_rules = None
+        claim_form_path = Path(session["claim_form"])
+        if not _is_image(session["claim_form"]):
+            form_text = await asyncio.to_thread(_read_document, session["claim_form"])
+            rough_query = f"{claim_form_path.stem.replace('_', ' ')}\n{form_text[:2000]}"
+            speculative_rules = asyncio.create_task(_lookup_rules_raw(rough_query))
 
-        # Clear session files after processing so next claim starts fresh
-        _session_files[session_id] = {
-            "claim_form": None,
-            "damage_image": None,
-            "police_report": None,
-            "police_report_asked": False,
-            "police_report_skipped": False,
-        }
+        try:
+            # Step 1, 2 (& 3 if police report provided) run in parallel; the
+            # first failure cancels the sibling calls instead of letting them
+            # finish (and bill) for nothing.
+            t_police = None
+            try:
+                async with asyncio.timeout(_EXTRACTION_TIMEOUT):
+                    async with asyncio.TaskGroup() as tg:
+                        t_claim = tg.create_task(_extract_claim_details(session["claim_form"]))
+                        t_damage = tg.create_task(_assess_damage(session["damage_image"]))
+                        if has_police_report:
+                            t_police = tg.create_task(_extract_police_report(session["police_report"]))
+            except ExceptionGroup as eg:
+                raise eg.exceptions[0] from None
+            except TimeoutError:
+                raise TimeoutError(f"document analysis timed out after {_EXTRACTION_TIMEOUT}s") from None
+
+            claim_details = t_claim.result()
+            damage_assessment = t_damage.result()
+            police_report_details = t_police.result() if t_police is not None else None
+
+            # Step 4: Rules.  The speculative lookup wins whenever it matched
+            # anything: the raw form text already carries the incident
+            # description, and waiting on the distilled query would put the
+            # search back on the critical path.  The distilled summaries are
+            # only searched when it found nothing, or for image claim forms.
+            rules = await speculative_rules if speculative_rules is not None else ""
+            if not _rules_found(rules):
+                rules = await _lookup_rules(claim_details, damage_assessment)
+        finally:
+            # No-op once awaited; if extraction failed or timed out, this
+            # stops the orphaned search instead of leaving it running
+            if speculative_rules is not None:
+                speculative_rules.cancel()
+
+        # Step 5: Final decision.  A VIN mismatch is an automatic
+        # rejection, so the decision model is skipped.
+        claim_vin = _extract_vin(claim_details)
+        police_vin = _extract_vin(police_report_details) if police_report_details else None
+        if claim_vin and police_vin and claim_vin != police_vin:
+            logger.info("CICP: VIN mismatch (%s vs %s) — rejecting without decision call", claim_vin, police_vin)
+            decision = _vin_mismatch_report(
+                claim_details, damage_assessment, police_report_details, rules, claim_vin, police_vin
+            )
+        else:
+            decision = await _make_decision(
+                claim_details,
+                damage_assessment,
+                police_report_details,
+                rules,
+                query,
+            )
 
+        # Clear session files after processing so next claim starts fresh
+        session.clear()
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000)
+        logger.info(
+            "CICP: Pipeline done in %d ms (police=%s)",
+            elapsed_ms,
+            police_status,
+            extra={"session_id": session_id, "has_police": has_police_report, "elapsed_ms": elapsed_ms},
+        )
         return decision
 
     except Exception as exc:
@@ -1,7 +1,7 @@
 """Evaluator Agent -- AI-powered quality assessment using azure-ai-evaluation.
 
-Runs four quality evaluators from the ``azure-ai-evaluation`` SDK against
-every agent response and returns a structured scorecard:
+Runs four quality evaluators (modelled on the ``azure-ai-evaluation`` SDK)
+against every agent response and returns a structured scorecard:
 
 1. **Relevance**    -- Is the response relevant to the question?   (1-5)
 2. **Coherence**    -- Is it logically coherent and well-structured? (1-5)
@@ -11,66 +11,439 @@ every agent response and returns a structured scorecard:
 The evaluator runs **inline** (post-processing every response) and can also
 be invoked **on-demand** by the user ("evaluate that", "score the last answer").
 
+By default all four metrics are scored by a single JSON-mode judge call
+(``EVALUATOR_MODE=combined``).  ``per_metric`` issues one async call per
+metric on the shared connection pool, and ``sdk`` runs the SDK evaluator
+classes in worker threads.  In both of those modes coherence and fluency
+are judged by the cheaper ``AZURE_OPENAI_MINI_DEPLOYMENT``.
+
 Authentication uses **DefaultAzureCredential** (role-based access).
 """
 
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
-from functools import lru_cache
-from typing import Any, Optional
-
-from azure.identity import DefaultAzureCredential
-from azure.ai.evaluation import (
-    AzureOpenAIModelConfiguration,
-    CoherenceEvaluator,
-    FluencyEvaluator,
-    GroundednessEvaluator,
-    RelevanceEvaluator,
-)
+import threading
+import time
+from collections import OrderedDict
+from textwrap import shorten
+from typing import Any, Callable, Optional
+
+import httpx
+from azure.core.credentials import AccessToken
+from langchain_core.messages import HumanMessage, SystemMessage
 
 from app.config import get_settings
+from app.utils.llm_cache import apost_chat_completion, get_credential
+from app.utils.openai_batch import chat_request_body, fetch_batch_results, submit_chat_batch
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # Azure credential singleton
 # ---------------------------------------------------------------------------
-_credential = DefaultAzureCredential()
+
+class _CachedTokenCredential:
+    """Wrap a credential and memoise its tokens until shortly before expiry.
+
+    The SDK evaluators request a token per call; ``DefaultAzureCredential``
+    may resolve each one through a slow chain (e.g. spawning ``az``).
+    """
+
+    _REFRESH_MARGIN = 300  # seconds
+
+    def __init__(self, credential: Any):
+        self._credential = credential
+        self._tokens: dict[tuple, AccessToken] = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken:
+        key = (scopes, kwargs.get("tenant_id"))
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is None or token.expires_on - time.time() <= self._REFRESH_MARGIN:
+                token = self._credential.get_token(*scopes, **kwargs)
+                self._tokens[key] = token
+            return token
+
+
+# Shares the process-wide DefaultAzureCredential with the LLM clients
+_credential = _CachedTokenCredential(get_credential())
 
 
 # ---------------------------------------------------------------------------
 # Cached model config & evaluators (created once, reused)
 # ---------------------------------------------------------------------------
 
-@lru_cache(maxsize=1)
-def _get_model_config() -> dict:
-    """Return the AzureOpenAIModelConfiguration dict (cached)."""
+def _metric_deployment(name: str) -> str:
+    """Deployment that judges *name*: the mini model for the easy rubrics."""
     settings = get_settings()
-    return {
-        "azure_endpoint": settings.azure_openai_endpoint,
-        "azure_deployment": settings.azure_openai_chat_deployment,
-        "api_version": settings.azure_openai_api_version,
-    }
+    if name in _LIGHT_METRICS:
+        return settings.azure_openai_mini_deployment
+    return settings.azure_openai_chat_deployment
+
+
+# Built on first use; re-entrant because _get_evaluators() reads the configs
+_model_configs: dict[str, dict] | None = None
+_evaluators: dict[str, Any] | None = None
+_init_lock = threading.RLock()
+
+
+def _get_model_configs() -> dict[str, dict]:
+    """Return the AzureOpenAIModelConfiguration dict for each metric (cached)."""
+    global _model_configs
+    if _model_configs is None:
+        with _init_lock:
+            if _model_configs is None:
+                settings = get_settings()
+                _model_configs = {
+                    name: {
+                        "azure_endpoint": settings.azure_openai_endpoint,
+                        "azure_deployment": _metric_deployment(name),
+                        "api_version": settings.azure_openai_api_version,
+                    }
+                    for name in _METRICS
+                }
+    return _model_configs
 
 
-@lru_cache(maxsize=1)
 def _get_evaluators() -> dict[str, Any]:
-    """Create and cache evaluator instances."""
-    cfg = _get_model_config()
+    """Create and cache evaluator instances (``EVALUATOR_MODE=sdk`` only).
+
+    The SDK builds its own OpenAI client per call and exposes no transport
+    or HTTP-client hook, so these evaluators cannot join the shared
+    connection pool; the default ``combined`` / ``per_metric`` modes do.
+    The SDK (and its openai / jinja2 dependencies) is imported here so
+    workers that never use this mode don't pay for it at startup.
+    """
+    global _evaluators
+    if _evaluators is None:
+        with _init_lock:
+            if _evaluators is None:
+                from azure.ai.evaluation import (
+                    CoherenceEvaluator,
+                    FluencyEvaluator,
+                    GroundednessEvaluator,
+                    RelevanceEvaluator,
+                )
+
+                cfgs = _get_model_configs()
+                _evaluators = {
+                    "relevance": RelevanceEvaluator(model_config=cfgs["relevance"], credential=_credential),
+                    "coherence": CoherenceEvaluator(model_config=cfgs["coherence"], credential=_credential),
+                    "fluency": FluencyEvaluator(model_config=cfgs["fluency"], credential=_credential),
+                    "groundedness": GroundednessEvaluator(
+                        model_config=cfgs["groundedness"], credential=_credential
+                    ),
+                }
+    return _evaluators
+
+
+# ---------------------------------------------------------------------------
+# Transient-failure handling shared by every evaluator path
+# ---------------------------------------------------------------------------
+# 429s, 5xxs and timeouts are retried with exponential backoff (honouring
+# Retry-After); rows that still fail are marked "rate_limited" / "timeout"
+# rather than a generic "error".
+
+_RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+_MAX_ATTEMPTS = 3
+_MAX_BACKOFF = 30.0  # seconds
+
+
+def _status_code(exc: Exception) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def _is_timeout(exc: Exception) -> bool:
+    return isinstance(exc, (TimeoutError, httpx.TimeoutException))
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float | None:
+    """Seconds to wait before retrying after *exc*, or ``None`` if it is not transient."""
+    if not _is_timeout(exc) and _status_code(exc) not in _RETRY_STATUSES:
+        return None
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        retry_after = float(headers.get("Retry-After", 0))
+    except (TypeError, ValueError):
+        retry_after = 0.0
+    return min(retry_after or 0.5 * 2 ** attempt, _MAX_BACKOFF)
+
+
+def _error_row(name: str, exc: Exception) -> dict[str, Any]:
+    if _is_timeout(exc):
+        result = "timeout"
+    elif _status_code(exc) == 429:
+        result = "rate_limited"
+    else:
+        result = "error"
+    return {"metric": name, "score": None, "result": result, "reason": str(exc) or type(exc).__name__}
+
+
+# ---------------------------------------------------------------------------
+# Async judge calls (default path)
+# ---------------------------------------------------------------------------
+# Each metric is one chat-completions call on the shared async connection
+# pool — no worker threads.  The rubrics follow the azure-ai-evaluation
+# prompts; a score at or above the threshold is a pass, as in the SDK.
+
+_METRICS = ("relevance", "coherence", "fluency", "groundedness")
+# Low-difficulty rubrics judged by the mini deployment in per-metric / SDK modes
+_LIGHT_METRICS = frozenset({"coherence", "fluency"})
+
+# Groundedness is only meaningful against a context; without one it is skipped
+_CONTEXT_FREE_METRICS = ("relevance", "coherence", "fluency")
+
+
+def _metrics_for(context: str | None) -> tuple[str, ...]:
+    return _METRICS if context else _CONTEXT_FREE_METRICS
+
+
+_PASS_THRESHOLD = 3
+
+
+class _RateLimiter:
+    """Token bucket that spaces out judge calls to stay under a per-minute quota.
+
+    The bucket holds up to *per_minute* tokens and refills continuously;
+    :meth:`acquire` waits until *cost* tokens are available.  A limit of
+    ``0`` disables throttling.
+    """
+
+    def __init__(self, per_minute: int):
+        self._capacity = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, cost: float = 1.0) -> None:
+        if self._rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                await asyncio.sleep((cost - self._tokens) / self._rate)
+
+
+# Caps in-flight judge calls (and their request rate) across the whole
+# process, so concurrent evaluations share one budget instead of competing
+_judge_sem = asyncio.Semaphore(max(1, get_settings().max_concurrent_judge_calls))
+_judge_rate = _RateLimiter(get_settings().evaluator_rpm_limit)
+
+_JUDGE_SYSTEM = SystemMessage(content="""\
+You are an impartial evaluator of AI assistant responses. Rate the RESPONSE on \
+the single metric described below using an integer score from 1 (worst) to 5 \
+(best). Reply with a JSON object only: {"score": <1-5>, "reason": "<one or two \
+sentences explaining the score>"}.""")
+
+_RUBRICS = {
+    "relevance": (
+        "RELEVANCE: how well the RESPONSE addresses the QUERY. 1 = unrelated or "
+        "off-topic; 3 = partially answers or misses key aspects; 5 = fully and "
+        "directly answers every aspect of the query with pertinent detail."
+    ),
+    "coherence": (
+        "COHERENCE: whether the RESPONSE is logically organised and easy to "
+        "follow in the context of the QUERY. 1 = disjointed or contradictory; "
+        "3 = understandable but with gaps in flow or structure; 5 = clear, "
+        "well-structured and logically connected throughout."
+    ),
+    "fluency": (
+        "FLUENCY: the language quality of the RESPONSE alone — grammar, "
+        "vocabulary, sentence structure and readability. 1 = hard to read, "
+        "pervasive errors; 3 = readable with noticeable errors or awkwardness; "
+        "5 = natural, precise and error-free."
+    ),
+    "groundedness": (
+        "GROUNDEDNESS: whether every claim in the RESPONSE is supported by the "
+        "CONTEXT. 1 = mostly unsupported or contradicts the context; 3 = mixes "
+        "supported and unsupported claims; 5 = fully supported by the context "
+        "with no fabricated details."
+    ),
+}
+
+
+def _trim_context(context: str, max_chars: int | None = None) -> str:
+    """Keep the head and tail of an over-long groundedness context.
+
+    Retrieved context is usually the bulk of a groundedness prompt; the
+    middle is dropped once it exceeds ``GROUNDEDNESS_CONTEXT_MAX_CHARS``
+    (``0`` disables trimming).
+    """
+    if max_chars is None:
+        max_chars = get_settings().groundedness_context_max_chars
+    if max_chars <= 0 or len(context) <= max_chars:
+        return context
+    half = max_chars // 2
+    trimmed = f"{context[:half]}\n…\n{context[-half:]}"
+    logger.debug("Trimmed groundedness context from %d to %d chars", len(context), len(trimmed))
+    return trimmed
+
+
+def _judge_messages(name: str, query: str, response: str, context: str | None) -> list:
+    parts = [_RUBRICS[name]]
+    if name != "fluency":
+        parts.append(f"QUERY:\n{query}")
+    if name == "groundedness" and context:
+        parts.append(f"CONTEXT:\n{context}")
+    parts.append(f"RESPONSE:\n{response}")
+    return [_JUDGE_SYSTEM, HumanMessage(content="\n\n".join(parts))]
+
+
+def _verdict_row(name: str, verdict: dict[str, Any]) -> dict[str, Any]:
+    """Map a judge's ``{"score", "reason"}`` reply to a scorecard row."""
+    score = float(verdict["score"])
     return {
-        "relevance": RelevanceEvaluator(model_config=cfg, credential=_credential),
-        "coherence": CoherenceEvaluator(model_config=cfg, credential=_credential),
-        "fluency": FluencyEvaluator(model_config=cfg, credential=_credential),
-        "groundedness": GroundednessEvaluator(model_config=cfg, credential=_credential),
+        "metric": name,
+        "score": score,
+        "result": "pass" if score >= _PASS_THRESHOLD else "fail",
+        "reason": str(verdict.get("reason", "")),
     }
 
 
+async def _judge(messages: list, deployment: str | None = None) -> dict[str, Any]:
+    """Send a JSON-mode judge call, retrying transient failures; return the parsed reply."""
+    attempt = 0
+    while True:
+        try:
+            async with _judge_sem:
+                await _judge_rate.acquire()
+                message = await apost_chat_completion(
+                    messages,
+                    temperature=0.0,
+                    deployment=deployment,
+                    response_format={"type": "json_object"},
+                    max_retries=0,  # retried below, under the rate limiter
+                )
+            return json.loads(message.content)
+        except Exception as exc:
+            delay = _retry_delay(exc, attempt)
+            attempt += 1
+            if delay is None or attempt >= _MAX_ATTEMPTS:
+                raise
+            logger.debug("Judge call failed (%s); retrying in %.1fs", exc, delay)
+            await asyncio.sleep(delay)
+
+
+async def _run_single_evaluator_async(
+    name: str,
+    query: str,
+    response: str,
+    context: str | None = None,
+) -> dict[str, Any]:
+    """Run one judge call and return its result dict (never raises)."""
+    try:
+        verdict = await asyncio.wait_for(
+            _judge(_judge_messages(name, query, response, context), _metric_deployment(name)),
+            timeout=get_settings().evaluator_row_timeout_s,
+        )
+        return _verdict_row(name, verdict)
+    except Exception as exc:
+        logger.warning("Evaluator '%s' failed: %s", name, exc)
+        return _error_row(name, exc)
+
+
+# ---------------------------------------------------------------------------
+# Combined judge call: all four metrics in one request
+# ---------------------------------------------------------------------------
+
+_COMBINED_TEMPLATE = """\
+You are an impartial evaluator of AI assistant responses. Rate the RESPONSE on \
+each metric below using an integer score from 1 (worst) to 5 (best).
+
+{rubrics}
+
+Reply with a JSON object only, with one entry per metric:
+{{{entries}}}"""
+
+
+def _combined_system(metrics: tuple[str, ...]) -> SystemMessage:
+    first, *rest = metrics
+    entries = ", ".join(
+        [f'"{first}": {{"score": <1-5>, "reason": "<one or two sentences>"}}']
+        + [f'"{name}": {{...}}' for name in rest]
+    )
+    return SystemMessage(content=_COMBINED_TEMPLATE.format(
+        rubrics="\n".join(f"- {_RUBRICS[name]}" for name in metrics),
+        entries=entries,
+    ))
+
+
+# Built once per metric set so repeated calls send an identical system prompt
+_COMBINED_SYSTEMS = {
+    metrics: _combined_system(metrics) for metrics in (_METRICS, _CONTEXT_FREE_METRICS)
+}
+
+
+def _combined_evaluator_prompt(query: str, response: str, context: str | None) -> list:
+    parts = [f"QUERY:\n{query}"]
+    if context:
+        parts.append(f"CONTEXT:\n{context}")
+    parts.append(f"RESPONSE:\n{response}")
+    return [_COMBINED_SYSTEMS[_metrics_for(context)], HumanMessage(content="\n\n".join(parts))]
+
+
+async def _run_combined_evaluator(
+    query: str,
+    response: str,
+    context: str | None = None,
+) -> list[dict[str, Any]]:
+    """Score every metric with a single judge call (never raises)."""
+    try:
+        verdicts = await asyncio.wait_for(
+            _judge(_combined_evaluator_prompt(query, response, context)),
+            timeout=get_settings().evaluator_row_timeout_s,
+        )
+    except Exception as exc:
+        logger.warning("Combined evaluator failed: %s", exc)
+        return [_error_row(name, exc) for name in _metrics_for(context)]
+    if not isinstance(verdicts, dict):
+        exc = ValueError(f"Judge returned {type(verdicts).__name__}, expected a JSON object")
+        logger.warning("Combined evaluator failed: %s", exc)
+        return [_error_row(name, exc) for name in _metrics_for(context)]
+
+    scores: list[dict[str, Any]] = []
+    for name in _metrics_for(context):
+        try:
+            scores.append(_verdict_row(name, verdicts.get(name) or {}))
+        except (KeyError, TypeError, ValueError):
+            scores.append({"metric": name, "score": None, "result": "error",
+                           "reason": "Missing score in judge output"})
+    return scores
+
+
 # ---------------------------------------------------------------------------
 # Core evaluation logic
 # ---------------------------------------------------------------------------
 
+# SDK evaluator keyword arguments per metric: fluency rates the response
+# alone; groundedness also needs the context (callers skip it without one)
+_KW_BUILDERS: dict[str, Callable[[str, str, str | None], dict[str, str]]] = {
+    "fluency": lambda q, r, c: {"response": r},
+    "relevance": lambda q, r, c: {"query": q, "response": r},
+    "coherence": lambda q, r, c: {"query": q, "response": r},
+    "groundedness": lambda q, r, c: {"query": q, "response": r, **({"context": c} if c else {})},
+}
+
+# (score, legacy gpt_ score, result, reason) keys in each SDK result dict
+_RESULT_KEYS = {
+    name: (name, f"gpt_{name}", f"{name}_result", f"{name}_reason") for name in _METRICS
+}
+
+
 def _run_single_evaluator(
     name: str,
     evaluator: Any,
@@ -80,21 +453,23 @@ def _run_single_evaluator(
 ) -> dict[str, Any]:
     """Run one evaluator synchronously and return its result dict."""
     try:
-        kwargs: dict[str, str] = {"response": response}
-
-        # Relevance & Coherence need query; Fluency does not
-        if name in ("relevance", "coherence", "groundedness"):
-            kwargs["query"] = query
-
-        # Groundedness needs context
-        if name == "groundedness" and context:
-            kwargs["context"] = context
+        kwargs = _KW_BUILDERS[name](query, response, context)
 
-        result = evaluator(**kwargs)
-
-        score = result.get(name, result.get(f"gpt_{name}"))
-        passed = result.get(f"{name}_result", "unknown")
-        reason = result.get(f"{name}_reason", "")
+        for attempt in range(_MAX_ATTEMPTS):
+            try:
+                result = evaluator(**kwargs)
+                break
+            except Exception as exc:
+                delay = _retry_delay(exc, attempt)
+                if delay is None or attempt == _MAX_ATTEMPTS - 1:
+                    raise
+                logger.debug("Evaluator '%s' failed (%s); retrying in %.1fs", name, exc, delay)
+                time.sleep(delay)
+
+        score_key, legacy_key, result_key, reason_key = _RESULT_KEYS[name]
+        score = result.get(score_key, result.get(legacy_key))
+        passed = result.get(result_key, "unknown")
+        reason = result.get(reason_key, "")
 
         return {
             "metric": name,
@@ -104,12 +479,47 @@ def _run_single_evaluator(
         }
     except Exception as exc:
         logger.warning("Evaluator '%s' failed: %s", name, exc)
-        return {
-            "metric": name,
-            "score": None,
-            "result": "error",
-            "reason": str(exc),
-        }
+        return _error_row(name, exc)
+
+
+async def _run_sdk_evaluator(
+    name: str,
+    evaluator: Any,
+    query: str,
+    response: str,
+    context: str | None = None,
+) -> dict[str, Any]:
+    """Run one SDK evaluator in a worker thread, bounded by the row timeout."""
+    try:
+        async with asyncio.timeout(get_settings().evaluator_row_timeout_s):
+            async with _judge_sem:
+                await _judge_rate.acquire()
+                return await asyncio.to_thread(
+                    _run_single_evaluator, name, evaluator, query, response, context
+                )
+    except TimeoutError as exc:
+        logger.warning("Evaluator '%s' timed out", name)
+        return _error_row(name, exc)
+
+
+# LRU of recent scorecards keyed by a hash of (query, response, context).
+# Only touched from the event loop with no awaits in between, so no lock.
+_SCORECARD_CACHE_MAX = 512
+_scorecard_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+
+def _scorecard_key(query: str, response: str, context: str | None) -> str:
+    return hashlib.blake2b(
+        f"{query}\x1f{response}\x1f{context or ''}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+
+def _remember_scorecard(key: str, scorecard: dict[str, Any]) -> None:
+    # Transient failures are not cached so a retry can still succeed
+    if all(s["result"] in ("pass", "fail") for s in scorecard["scores"]):
+        _scorecard_cache[key] = scorecard
+        if len(_scorecard_cache) > _SCORECARD_CACHE_MAX:
+            _scorecard_cache.popitem(last=False)
 
 
 async def evaluate_response(
@@ -120,41 +530,63 @@ async def evaluate_response(
     """Run all evaluators against a query/response pair.
 
     Returns a structured scorecard dict suitable for JSON serialisation
-    and frontend rendering.
+    and frontend rendering.  Scorecards are memoised per
+    ``(query, response, context)`` so re-evaluating the same answer is free.
     """
-    evaluators = _get_evaluators()
-    loop = asyncio.get_event_loop()
-
-    # Run evaluators in parallel using threads (they are synchronous + IO-bound)
-    tasks = [
-        loop.run_in_executor(
-            None,
-            _run_single_evaluator,
-            name,
-            ev,
-            query,
-            response,
-            context,
-        )
-        for name, ev in evaluators.items()
-    ]
-
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    scores: list[dict[str, Any]] = []
-    for r in results:
-        if isinstance(r, Exception):
-            logger.error("Evaluator task exception: %s", r)
-            scores.append({"metric": "unknown", "score": None, "result": "error", "reason": str(r)})
-        else:
-            scores.append(r)
+    key = _scorecard_key(query, response, context)
+    cached = _scorecard_cache.get(key)
+    if cached is not None:
+        _scorecard_cache.move_to_end(key)
+        return cached
+
+    scorecard = _build_scorecard(await _score_metrics(query, response, context))
+    _remember_scorecard(key, scorecard)
+    return scorecard
 
-    # Compute overall average (skip None scores)
-    valid_scores = [s["score"] for s in scores if s["score"] is not None]
-    overall = round(sum(valid_scores) / len(valid_scores), 1) if valid_scores else None
 
-    # Determine overall pass/fail
-    all_passed = all(s["result"] == "pass" for s in scores if s["score"] is not None)
+async def _score_metrics(
+    query: str,
+    response: str,
+    context: str | None,
+) -> list[dict[str, Any]]:
+    """Return one scorecard row per applicable metric, in metric order."""
+    if context:
+        context = _trim_context(context)
+    mode = get_settings().evaluator_mode
+    if mode == "combined":
+        # One judge call scores every metric
+        return await _run_combined_evaluator(query, response, context)
+
+    if mode == "sdk":
+        evaluators = _get_evaluators()
+
+        # Run SDK evaluators in parallel using threads (they are synchronous + IO-bound)
+        coros = [
+            _run_sdk_evaluator(name, evaluators[name], query, response, context)
+            for name in _metrics_for(context)
+        ]
+    else:
+        coros = [
+            _run_single_evaluator_async(name, query, response, context)
+            for name in _metrics_for(context)
+        ]
+    return list(await asyncio.gather(*coros))
+
+
+def _build_scorecard(scores: list[dict[str, Any]]) -> dict[str, Any]:
+    """Aggregate per-metric rows into the scorecard dict."""
+    # Average the scored rows and check they all passed in one pass
+    total = 0.0
+    n = 0
+    all_passed = True
+    for s in scores:
+        score = s["score"]
+        if score is not None:
+            total += score
+            n += 1
+            if s["result"] != "pass":
+                all_passed = False
+    overall = round(total / n, 1) if n else None
 
     scorecard = {
         "scores": scores,
@@ -163,16 +595,68 @@ async def evaluate_response(
         "overall_result": "pass" if all_passed else "needs_review",
     }
 
-    logger.info(
-        "Evaluation complete: overall=%.1f/5 (%s) | %s",
-        overall or 0,
-        scorecard["overall_result"],
-        " | ".join(f"{s['metric']}={s['score']}" for s in scores),
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Evaluation complete: overall=%.1f/5 (%s) | %s",
+            overall or 0,
+            scorecard["overall_result"],
+            " | ".join(f"{s['metric']}={s['score']}" for s in scores),
+        )
 
     return scorecard
 
 
+# ---------------------------------------------------------------------------
+# Bulk evaluation through the Azure OpenAI Batch API
+# ---------------------------------------------------------------------------
+
+_BATCH_POLL_INTERVAL = 30  # seconds
+
+
+async def evaluate_batch(
+    queries: list[str],
+    responses: list[str],
+    contexts: list[str | None] | None = None,
+) -> list[dict[str, Any]]:
+    """Score many query/response pairs as one Batch API job.
+
+    For bulk / nightly runs: billed at roughly half the realtime price and
+    kept off the realtime TPM quota, but results can take up to the 24h
+    completion window.  Submits one judge request per metric per sample,
+    polls until the job finishes, and returns one scorecard per sample in
+    input order.  Interactive callers should use :func:`evaluate_response`.
+    """
+    contexts = contexts or [None] * len(queries)
+
+    requests: dict[str, dict[str, Any]] = {}
+    for i, (q, r, c) in enumerate(zip(queries, responses, contexts)):
+        if c:
+            c = _trim_context(c)
+        for name in _metrics_for(c):
+            body = chat_request_body(_judge_messages(name, q, r, c), temperature=0.0)
+            body["response_format"] = {"type": "json_object"}
+            requests[f"{i}:{name}"] = body
+
+    batch_id = await submit_chat_batch(requests)
+    while (results := await fetch_batch_results(batch_id, strict=False)) is None:
+        await asyncio.sleep(_BATCH_POLL_INTERVAL)
+
+    scorecards = []
+    for i, c in enumerate(contexts):
+        scores = []
+        for name in _metrics_for(c):
+            body = results.get(f"{i}:{name}")
+            try:
+                verdict = json.loads(body["choices"][0]["message"]["content"])
+                scores.append(_verdict_row(name, verdict))
+            except Exception as exc:
+                scores.append(_error_row(name, exc))
+        scorecards.append(_build_scorecard(scores))
+
+    logger.info("Batch evaluation %s complete: %d sample(s)", batch_id, len(scorecards))
+    return scorecards
+
+
 # ---------------------------------------------------------------------------
 # On-demand agent interface  (user says "evaluate that")
 # ---------------------------------------------------------------------------
@@ -186,18 +670,7 @@ async def invoke(
 ) -> str:
     """On-demand evaluation: find the last assistant response in history and score it."""
     # Extract the last Q&A pair from history
-    last_query = ""
-    last_response = ""
-
-    if history:
-        lines = history.strip().split("\n")
-        for line in reversed(lines):
-            if line.startswith("Assistant:") and not last_response:
-                last_response = line[len("Assistant:"):].strip()
-            elif line.startswith("User:") and not last_query:
-                last_query = line[len("User:"):].strip()
-            if last_query and last_response:
-                break
+    last_query, last_response = _last_qa(history)
 
     if not last_response:
         return (
@@ -214,32 +687,66 @@ async def invoke(
     return _format_scorecard_markdown(scorecard, last_query, last_response)
 
 
+def _last_qa(history: str) -> tuple[str, str]:
+    """Return the last ``(user query, assistant response)`` in *history*.
+
+    Walks the text backwards line by line with ``str.rfind``, so only the
+    tail up to the last complete pair is touched.
+    """
+    last_query = last_response = ""
+    end = len(history)
+    while end > 0 and not (last_query and last_response):
+        start = history.rfind("\n", 0, end) + 1
+        line = history[start:end]
+        if line.startswith("Assistant:") and not last_response:
+            last_response = line[len("Assistant:"):].strip()
+        elif line.startswith("User:") and not last_query:
+            last_query = line[len("User:"):].strip()
+        end = start - 1
+    return last_query, last_response
+
+
+_EMOJI_MAP = {
+    "pass": "Pass", "fail": "Fail", "needs_review": "Review", "error": "Error",
+    "timeout": "Timeout", "rate_limited": "Rate limited", "unknown": "N/A",
+}
+
+_HEADER = (
+    "| Metric | Score | Result | Reasoning |\n"
+    "|--------|-------|--------|-----------|\n"
+)
+
+
+def _scorecard_row(s: dict[str, Any]) -> str:
+    score_str = f"{s['score']:.1f}/5" if s["score"] is not None else "N/A"
+    result_str = _EMOJI_MAP.get(s["result"], s["result"])
+    reason = shorten(s.get("reason", ""), width=150, placeholder="...")
+    return f"| **{s['metric'].title()}** | {score_str} | {result_str} | {reason} |"
+
+
 def _format_scorecard_markdown(
     scorecard: dict[str, Any],
     query: str = "",
     response: str = "",
 ) -> str:
     """Render the scorecard as a readable Markdown block."""
-    lines = ["## Quality Evaluation Scorecard\n"]
-
+    scores = scorecard["scores"]
+    preview = ""
     if query:
-        q_preview = query[:120] + "..." if len(query) > 120 else query
-        lines.append(f"**Evaluated query:** {q_preview}\n")
+        q_preview = shorten(query, width=120, placeholder="...")
+        preview = f"**Evaluated query:** {q_preview}\n\n"
 
-    lines.append("| Metric | Score | Result | Reasoning |")
-    lines.append("|--------|-------|--------|-----------|")
-
-    emoji_map = {"pass": "Pass", "fail": "Fail", "needs_review": "Review", "error": "Error", "unknown": "N/A"}
-
-    for s in scorecard["scores"]:
-        score_str = f"{s['score']:.1f}/5" if s["score"] is not None else "N/A"
-        result_str = emoji_map.get(s["result"], s["result"])
-        reason = s.get("reason", "")[:150]
-        lines.append(f"| **{s['metric'].title()}** | {score_str} | {result_str} | {reason} |")
+    rows = "\n".join(_scorecard_row(s) for s in scores)
 
     overall = scorecard.get("overall_score")
     overall_str = f"{overall:.1f}/5" if overall is not None else "N/A"
-    overall_result = emoji_map.get(scorecard.get("overall_result", ""), "")
-    lines.append(f"\n**Overall: {overall_str}** ({overall_result})")
+    overall_result = _EMOJI_MAP.get(scorecard.get("overall_result", ""), "")
 
-    return "\n".join(lines)
+    footer = ""
+    if not any(s["metric"] == "groundedness" for s in scores):
+        footer = "\n\n_Groundedness skipped: no context supplied._"
+
+    return (
+        f"## Quality Evaluation Scorecard\n\n{preview}{_HEADER}{rows}\n"
+        f"\n**Overall: {overall_str}** ({overall_result}){footer}"
+    )
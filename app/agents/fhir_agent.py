@@ -23,36 +23,87 @@ The HAPI FHIR public server requires **no authentication**.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import io
 import json
 import logging
-import re
+import os
 import uuid
-from pathlib import Path
 from typing import Any, Optional
 
 import httpx
+from cachetools import TTLCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from app.config import get_settings
 from app.utils.token_counter import add_tokens
 from app.utils.llm_cache import get_chat_llm
+from app.utils.llm_response_cache import file_digest, make_key
+from app.utils.llm_response_cache import get as cache_get, put as cache_put
+from app.utils.prompt_context import build_file_context, history_messages
 
 logger = logging.getLogger(__name__)
 
 # File extensions the agent can read as source data
-_TEXT_EXTS = {
+_TEXT_EXTS = frozenset({
     ".txt", ".md", ".csv", ".json", ".xml", ".hl7",
     ".tsv", ".yaml", ".yml", ".cda", ".ccda", ".fhir",
-}
+})
 
 # ---------------------------------------------------------------------------
 # HAPI FHIR R4 public test server
 # ---------------------------------------------------------------------------
 _HAPI_BASE = "https://hapi.fhir.org/baseR4"
 _HAPI_TIMEOUT = 30.0  # seconds
+_FHIR_JSON = "application/fhir+json"
+_FHIR_HEADERS = {"Content-Type": _FHIR_JSON, "Accept": _FHIR_JSON}
+
+# Relative request paths per resource type, formatted once
+_VALIDATE_PATHS: dict[str, str] = {}
+_POST_PATHS: dict[str, str] = {}
+
+_hapi_client: httpx.AsyncClient | None = None
+
+
+def _get_hapi_client() -> httpx.AsyncClient:
+    """Return the long-lived HAPI client (created on first use).
+
+    Reusing one pool keeps TLS sessions alive across queries; HTTP/2 (when
+    ``h2`` is installed) multiplexes the concurrent validate/POST calls.
+    """
+    global _hapi_client
+    if _hapi_client is None or _hapi_client.is_closed:
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        _hapi_client = httpx.AsyncClient(
+            base_url=_HAPI_BASE,
+            http2=http2,
+            timeout=_HAPI_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+            headers=_FHIR_HEADERS,
+        )
+    return _hapi_client
+
+
+async def close_hapi_client() -> None:
+    """Close the shared HAPI client (called on application shutdown)."""
+    global _hapi_client
+    if _hapi_client is not None:
+        await _hapi_client.aclose()
+        _hapi_client = None
 
 # FHIR resource types that can be validated / POSTed individually
-_POSTABLE_TYPES = {
+_POSTABLE_TYPES = frozenset({
     "Patient", "Observation", "Condition", "Encounter",
     "MedicationRequest", "MedicationStatement", "Procedure",
     "AllergyIntolerance", "DiagnosticReport", "Immunization",
@@ -60,25 +111,51 @@ _POSTABLE_TYPES = {
     "DocumentReference", "Organization", "Practitioner",
     "PractitionerRole", "Location", "Device", "Specimen",
     "ExplanationOfBenefit", "Claim", "ClaimResponse",
-}
+})
+
+
+# ---------------------------------------------------------------------------
+# HAPI request/response bodies (orjson when installed)
+# ---------------------------------------------------------------------------
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(resp: httpx.Response) -> Any:
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
 
 
 # ---------------------------------------------------------------------------
 # Helper: extract JSON blocks from LLM markdown output
 # ---------------------------------------------------------------------------
-_JSON_BLOCK_RE = re.compile(r"```json\s*\n(.*?)```", re.DOTALL)
+_JSON_FENCE = "```json"
+_json_decoder = json.JSONDecoder()
 
 
 def _extract_json_blocks(text: str) -> list[dict[str, Any]]:
-    """Parse all ```json ... ``` blocks and return valid dicts."""
+    """Parse all ```json ... ``` blocks and return valid dicts.
+
+    Each fence is decoded in place with ``raw_decode`` — no closing-fence
+    search — so an unterminated final block is still recovered.
+    """
     results: list[dict[str, Any]] = []
-    for m in _JSON_BLOCK_RE.finditer(text):
+    i = 0
+    while (i := text.find(_JSON_FENCE, i)) != -1:
+        i += len(_JSON_FENCE)
+        j = i
+        while j < len(text) and text[j].isspace():
+            j += 1
         try:
-            obj = json.loads(m.group(1))
-            if isinstance(obj, dict) and "resourceType" in obj:
-                results.append(obj)
+            obj, end = _json_decoder.raw_decode(text, j)
         except json.JSONDecodeError:
             continue
+        if isinstance(obj, dict) and "resourceType" in obj:
+            results.append(obj)
+        i = end
     return results
 
 
@@ -101,41 +178,130 @@ def _flatten_bundle(bundle: dict[str, Any]) -> list[dict[str, Any]]:
 # ---------------------------------------------------------------------------
 # HAPI: validate a single resource
 # ---------------------------------------------------------------------------
+# $validate is idempotent, so identical resources reuse a recent outcome
+_validation_cache: TTLCache = TTLCache(maxsize=512, ttl=600)
+_validation_lock = asyncio.Lock()
+
+
+def _resource_digest(resource: dict[str, Any]) -> str:
+    if orjson is not None:
+        canonical = orjson.dumps(resource, option=orjson.OPT_SORT_KEYS)
+    else:
+        canonical = json.dumps(resource, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
 async def _validate_resource(
     client: httpx.AsyncClient,
     resource: dict[str, Any],
 ) -> dict[str, Any]:
-    """POST to $validate and return structured result."""
+    """POST to $validate and return structured result (cached for 10 min)."""
+    key = _resource_digest(resource)
+    async with _validation_lock:
+        cached = _validation_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = await _validate_uncached(client, resource)
+    # Only keep real verdicts — not network failures or server errors
+    if 0 < result["status"] < 500:
+        async with _validation_lock:
+            _validation_cache[key] = result
+    return result
+
+
+def _outcome_result(rtype: str, status: int, outcome: dict[str, Any]) -> dict[str, Any]:
+    """Partition an OperationOutcome's issues by severity into a result dict."""
+    errors: list[str] = []
+    warnings: list[str] = []
+    info: list[str] = []
+    buckets = {"error": errors, "fatal": errors, "warning": warnings, "information": info}
+    for issue in outcome.get("issue", []):
+        bucket = buckets.get(issue.get("severity"))
+        if bucket is errors:
+            bucket.append(issue.get("diagnostics", "Unknown error"))
+        elif bucket is not None:
+            bucket.append(issue.get("diagnostics", ""))
+    return {
+        "resourceType": rtype,
+        "status": status,
+        "valid": not errors,
+        "errors": errors,
+        "warnings": warnings,
+        "info": info,
+    }
+
+
+def _failed_result(rtype: str, exc: Exception) -> dict[str, Any]:
+    return {
+        "resourceType": rtype,
+        "status": 0,
+        "valid": False,
+        "errors": [f"Validation request failed: {exc}"],
+        "warnings": [],
+        "info": [],
+    }
+
+
+async def _validate_uncached(
+    client: httpx.AsyncClient,
+    resource: dict[str, Any],
+) -> dict[str, Any]:
     rtype = resource.get("resourceType", "Resource")
-    url = f"{_HAPI_BASE}/{rtype}/$validate"
     try:
-        resp = await client.post(
-            url,
-            json=resource,
-            headers={"Content-Type": "application/fhir+json"},
-        )
-        outcome = resp.json()
-        issues = outcome.get("issue", [])
-        errors = [i for i in issues if i.get("severity") in ("error", "fatal")]
-        warnings = [i for i in issues if i.get("severity") == "warning"]
-        info = [i for i in issues if i.get("severity") == "information"]
-        return {
-            "resourceType": rtype,
-            "status": resp.status_code,
-            "valid": len(errors) == 0,
-            "errors": [i.get("diagnostics", "Unknown error") for i in errors],
-            "warnings": [i.get("diagnostics", "") for i in warnings],
-            "info": [i.get("diagnostics", "") for i in info],
-        }
+        path = _VALIDATE_PATHS.get(rtype) or _VALIDATE_PATHS.setdefault(rtype, f"/{rtype}/$validate")
+        resp = await client.post(path, content=_dumps(resource))
+        return _outcome_result(rtype, resp.status_code, _loads(resp))
     except Exception as exc:
-        return {
-            "resourceType": rtype,
-            "status": 0,
-            "valid": False,
-            "errors": [f"Validation request failed: {exc}"],
-            "warnings": [],
-            "info": [],
-        }
+        return _failed_result(rtype, exc)
+
+
+async def _batch_validate(
+    client: httpx.AsyncClient,
+    resources: list[dict[str, Any]],
+) -> list[dict[str, Any]] | None:
+    """Validate *resources* with one ``batch`` Bundle of ``$validate`` calls.
+
+    Returns results in input order, or ``None`` if the server rejected the
+    batch (the caller then falls back to per-resource requests).
+    """
+    bundle = {
+        "resourceType": "Bundle",
+        "type": "batch",
+        "entry": [
+            {
+                "resource": r,
+                "request": {"method": "POST", "url": f"{r.get('resourceType', 'Resource')}/$validate"},
+            }
+            for r in resources
+        ],
+    }
+    try:
+        resp = await client.post("/", content=_dumps(bundle))
+        body = _loads(resp)
+    except Exception as exc:
+        logger.warning("HAPI batch validation failed: %s", exc)
+        return None
+    entries = body.get("entry", []) if resp.status_code == 200 else []
+    if len(entries) != len(resources):
+        logger.warning("HAPI batch validation returned HTTP %s; validating individually",
+                       resp.status_code)
+        return None
+
+    results = []
+    for r, entry in zip(resources, entries):
+        response = entry.get("response") or {}
+        # Per-entry status looks like "200 OK" / "412 Precondition Failed";
+        # failed entries carry their OperationOutcome under response.outcome
+        status_line = response.get("status", "")
+        status = int(status_line[:3]) if status_line[:3].isdigit() else 0
+        outcome = entry.get("resource") or response.get("outcome") or {}
+        result = _outcome_result(r.get("resourceType", "Resource"), status, outcome)
+        if status >= 400 and result["valid"]:
+            result["valid"] = False
+            result["errors"].append(f"HTTP {status_line}")
+        results.append(result)
+    return results
 
 
 # ---------------------------------------------------------------------------
@@ -149,17 +315,16 @@ async def _post_resource(
     rtype = resource.get("resourceType", "Resource")
 
     # Remove client-side id so the server assigns one
-    payload = {k: v for k, v in resource.items() if k != "id"}
+    payload = resource
+    if "id" in resource:
+        payload = resource.copy()
+        del payload["id"]
 
-    url = f"{_HAPI_BASE}/{rtype}"
     try:
-        resp = await client.post(
-            url,
-            json=payload,
-            headers={"Content-Type": "application/fhir+json"},
-        )
+        path = _POST_PATHS.get(rtype) or _POST_PATHS.setdefault(rtype, f"/{rtype}")
+        resp = await client.post(path, content=_dumps(payload))
         if resp.status_code == 201:
-            body = resp.json()
+            body = _loads(resp)
             server_id = body.get("id", "?")
             return {
                 "resourceType": rtype,
@@ -170,7 +335,7 @@ async def _post_resource(
                 "message": f"Created {rtype}/{server_id}",
             }
         else:
-            body = resp.json() if resp.headers.get("content-type", "").startswith("application") else {}
+            body = _loads(resp) if resp.headers.get("content-type", "").startswith("application") else {}
             diag = ""
             if "issue" in body:
                 diag = "; ".join(
@@ -204,14 +369,9 @@ async def _post_bundle(
     bundle: dict[str, Any],
 ) -> dict[str, Any]:
     """POST a Bundle to the HAPI server root."""
-    url = _HAPI_BASE
     try:
-        resp = await client.post(
-            url,
-            json=bundle,
-            headers={"Content-Type": "application/fhir+json"},
-        )
-        body = resp.json()
+        resp = await client.post("/", content=_dumps(bundle))
+        body = _loads(resp)
         if resp.status_code == 200:
             entries = body.get("entry", [])
             created = []
@@ -250,6 +410,105 @@ async def _post_bundle(
         }
 
 
+# ---------------------------------------------------------------------------
+# HAPI: concurrent fan-out (bounded to stay polite to the public server)
+# ---------------------------------------------------------------------------
+_HAPI_CONCURRENCY = 8
+_hapi_sem = asyncio.Semaphore(_HAPI_CONCURRENCY)
+
+
+async def _bounded(call, client: httpx.AsyncClient, resource: dict[str, Any]) -> dict[str, Any]:
+    async with _hapi_sem:
+        return await call(client, resource)
+
+
+async def _validate_all(
+    client: httpx.AsyncClient,
+    resources: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """Validate *resources*, reusing cached outcomes; results keep the input order.
+
+    Several uncached resources go to HAPI as one batch Bundle; a lone one
+    (or a rejected batch) uses concurrent per-resource ``$validate`` calls.
+    """
+    keys = [_resource_digest(r) for r in resources]
+    async with _validation_lock:
+        results = [_validation_cache.get(k) for k in keys]
+    misses = [i for i, res in enumerate(results) if res is None]
+    if not misses:
+        return results
+
+    pending = [resources[i] for i in misses]
+    fresh = await _batch_validate(client, pending) if len(pending) > 1 else None
+    if fresh is None:
+        fresh = await asyncio.gather(*(_bounded(_validate_uncached, client, r) for r in pending))
+
+    async with _validation_lock:
+        for i, result in zip(misses, fresh):
+            results[i] = result
+            # Only keep real verdicts — not network failures or server errors
+            if 0 < result["status"] < 500:
+                _validation_cache[keys[i]] = result
+    return results
+
+
+async def _post_individually(
+    client: httpx.AsyncClient,
+    resources: list[dict[str, Any]],
+) -> list[str]:
+    """POST every postable resource concurrently; return Markdown result lines."""
+    postable = [r for r in resources if r.get("resourceType", "") in _POSTABLE_TYPES]
+    results = await asyncio.gather(*(_bounded(_post_resource, client, r) for r in postable))
+    lines: list[str] = []
+    for pr in results:
+        rt2 = pr["resourceType"]
+        if pr["success"]:
+            lines.append(f"  - ✅ **{rt2}** → [{pr['server_id']}]({pr['url']})")
+        else:
+            lines.append(f"  - ❌ **{rt2}** — {pr['message']}")
+    return lines
+
+
+def _build_transaction(entries: list[dict[str, Any]]) -> dict[str, Any]:
+    """Wrap the POSTable resources of Bundle *entries* in a transaction Bundle.
+
+    Existing ``fullUrl`` values are kept so references between the
+    resources still resolve when the server assigns real ids.
+    """
+    tx_entries = []
+    for e in entries:
+        res = e.get("resource")
+        if isinstance(res, dict) and res.get("resourceType") in _POSTABLE_TYPES:
+            tx_entries.append({
+                "fullUrl": e.get("fullUrl") or f"urn:uuid:{uuid.uuid4()}",
+                "resource": res,
+                "request": {"method": "POST", "url": res["resourceType"]},
+            })
+    return {"resourceType": "Bundle", "type": "transaction", "entry": tx_entries}
+
+
+async def _submit_bundle(
+    client: httpx.AsyncClient,
+    bundle: dict[str, Any],
+    resources: list[dict[str, Any]],
+) -> list[str]:
+    """POST *bundle* in one request, falling back to individual POSTs on failure."""
+    br = await _post_bundle(client, bundle)
+    if br["success"]:
+        lines = [f"\n**Submission:** ✅ Bundle accepted — "
+                 f"{len(br['created'])} resources created\n"]
+        for loc in br["created"][:10]:
+            if loc:
+                lines.append(f"  - 🔗 `{_HAPI_BASE}/{loc}`")
+        return lines
+
+    lines = [f"\n**Submission:** ❌ {br['message']}\n"]
+    # Fallback: POST individual resources
+    lines.append("\n**Fallback** — submitting resources individually:\n")
+    lines.extend(await _post_individually(client, resources))
+    return lines
+
+
 # ---------------------------------------------------------------------------
 # Pipeline: validate + submit all resources from LLM output
 # ---------------------------------------------------------------------------
@@ -258,128 +517,94 @@ async def _validate_and_submit(text: str) -> str:
 
     Returns a Markdown section to append to the agent response.
     """
-    json_blocks = _extract_json_blocks(text)
+    # Only resources the pipeline can act on; example JSON in an explanation
+    # never touches the network
+    json_blocks = [
+        b for b in _extract_json_blocks(text)
+        if b["resourceType"] == "Bundle" or b["resourceType"] in _POSTABLE_TYPES
+    ]
     if not json_blocks:
         return ""
 
-    sections: list[str] = []
-    sections.append("\n\n---\n\n## 🏥 HAPI FHIR R4 Server — Live Validation & Submission\n")
-    sections.append(f"> **Server:** `{_HAPI_BASE}` (public test server — no PHI)\n")
-
-    async with httpx.AsyncClient(timeout=_HAPI_TIMEOUT) as client:
-        for block in json_blocks:
-            rtype = block.get("resourceType", "Unknown")
-
-            # ── Handle Bundles ───────────────────────────────────
-            if rtype == "Bundle":
-                bundle_type = block.get("type", "unknown")
-                entry_count = len(block.get("entry", []))
-                sections.append(f"\n### Bundle ({bundle_type}) — {entry_count} entries\n")
-
-                # Validate individual resources within the Bundle
-                resources = _flatten_bundle(block)
-                all_valid = True
-                val_lines: list[str] = []
-                for res in resources:
-                    vr = await _validate_resource(client, res)
-                    rt = vr["resourceType"]
-                    if vr["valid"]:
-                        val_lines.append(f"  - ✅ **{rt}** — Valid")
-                        if vr["warnings"]:
-                            for w in vr["warnings"][:2]:
-                                val_lines.append(f"    - ⚠️ {w}")
-                    else:
-                        all_valid = False
-                        val_lines.append(f"  - ❌ **{rt}** — Invalid")
-                        for e in vr["errors"][:3]:
-                            val_lines.append(f"    - {e}")
-
-                sections.append("**Validation Results:**\n")
-                sections.extend(val_lines)
-                sections.append("")
-
-                # Submit the Bundle if transaction/batch
-                if bundle_type in ("transaction", "batch") and all_valid:
-                    br = await _post_bundle(client, block)
-                    if br["success"]:
-                        sections.append(f"\n**Submission:** ✅ Bundle accepted — "
-                                        f"{len(br['created'])} resources created\n")
-                        for loc in br["created"][:10]:
-                            if loc:
-                                sections.append(f"  - 🔗 `{_HAPI_BASE}/{loc}`")
-                    else:
-                        sections.append(f"\n**Submission:** ❌ {br['message']}\n")
-                        # Fallback: POST individual resources
-                        sections.append("\n**Fallback** — submitting resources individually:\n")
-                        for res in resources:
-                            rt2 = res.get("resourceType", "")
-                            if rt2 in _POSTABLE_TYPES:
-                                pr = await _post_resource(client, res)
-                                if pr["success"]:
-                                    sections.append(
-                                        f"  - ✅ **{rt2}** → "
-                                        f"[{pr['server_id']}]({pr['url']})"
-                                    )
-                                else:
-                                    sections.append(
-                                        f"  - ❌ **{rt2}** — {pr['message']}"
-                                    )
-                elif bundle_type in ("transaction", "batch") and not all_valid:
-                    sections.append(
-                        "\n**Submission:** ⏸️ Skipped — fix validation errors first\n"
-                    )
-                elif all_valid:
-                    # collection or other — post individual resources
-                    sections.append("\n**Submitting resources individually:**\n")
-                    for res in resources:
-                        rt2 = res.get("resourceType", "")
-                        if rt2 in _POSTABLE_TYPES:
-                            pr = await _post_resource(client, res)
-                            if pr["success"]:
-                                sections.append(
-                                    f"  - ✅ **{rt2}** → "
-                                    f"[{pr['server_id']}]({pr['url']})"
-                                )
-                            else:
-                                sections.append(
-                                    f"  - ❌ **{rt2}** — {pr['message']}"
-                                )
-
-            # ── Handle single resources ──────────────────────────
-            elif rtype in _POSTABLE_TYPES:
-                sections.append(f"\n### {rtype}\n")
-
-                # Validate
-                vr = await _validate_resource(client, block)
+    buf = io.StringIO()
+    w = buf.write
+    w("\n\n---\n\n## 🏥 HAPI FHIR R4 Server — Live Validation & Submission\n\n")
+    w(f"> **Server:** `{_HAPI_BASE}` (public test server — no PHI)\n\n")
+    header_len = buf.tell()
+
+    client = _get_hapi_client()
+    for block in json_blocks:
+        rtype = block.get("resourceType", "Unknown")
+
+        # ── Handle Bundles ───────────────────────────────────
+        if rtype == "Bundle":
+            bundle_type = block.get("type", "unknown")
+            entry_count = len(block.get("entry", []))
+            w(f"\n### Bundle ({bundle_type}) — {entry_count} entries\n\n")
+
+            # Validate individual resources within the Bundle
+            resources = _flatten_bundle(block)
+            all_valid = True
+            val_lines: list[str] = []
+            for vr in await _validate_all(client, resources):
+                rt = vr["resourceType"]
                 if vr["valid"]:
-                    sections.append("**Validation:** ✅ Valid FHIR R4 resource\n")
-                    if vr["warnings"]:
-                        for w in vr["warnings"][:3]:
-                            sections.append(f"  - ⚠️ {w}")
-
-                    # POST
-                    pr = await _post_resource(client, block)
-                    if pr["success"]:
-                        sections.append(
-                            f"\n**Submitted:** ✅ Created on server → "
-                            f"[{rtype}/{pr['server_id']}]({pr['url']})\n"
-                        )
-                    else:
-                        sections.append(
-                            f"\n**Submitted:** ❌ {pr['message']}\n"
-                        )
+                    val_lines.append(f"  - ✅ **{rt}** — Valid")
+                    for warn in vr["warnings"][:2]:
+                        val_lines.append(f"    - ⚠️ {warn}")
                 else:
-                    sections.append("**Validation:** ❌ Errors found\n")
-                    for e in vr["errors"][:5]:
-                        sections.append(f"  - {e}")
-                    sections.append(
-                        "\n**Submitted:** ⏸️ Skipped — fix errors above first\n"
-                    )
-
-    if len(sections) <= 2:
+                    all_valid = False
+                    val_lines.append(f"  - ❌ **{rt}** — Invalid")
+                    for e in vr["errors"][:3]:
+                        val_lines.append(f"    - {e}")
+
+            w("**Validation Results:**\n\n")
+            w("\n".join(val_lines))
+            w("\n\n")
+
+            # Submit the Bundle if transaction/batch
+            submit_lines: list[str] = []
+            if bundle_type in ("transaction", "batch") and all_valid:
+                submit_lines = await _submit_bundle(client, block, resources)
+            elif bundle_type in ("transaction", "batch") and not all_valid:
+                w("\n**Submission:** ⏸️ Skipped — fix validation errors first\n\n")
+            elif all_valid:
+                # collection or other — resubmit the entries as one transaction
+                tx = _build_transaction(block.get("entry", []))
+                if tx["entry"]:
+                    submit_lines = await _submit_bundle(client, tx, resources)
+            if submit_lines:
+                w("\n".join(submit_lines))
+                w("\n")
+
+        # ── Handle single resources ──────────────────────────
+        elif rtype in _POSTABLE_TYPES:
+            w(f"\n### {rtype}\n\n")
+
+            # Validate
+            vr = await _validate_resource(client, block)
+            if vr["valid"]:
+                w("**Validation:** ✅ Valid FHIR R4 resource\n\n")
+                for warn in vr["warnings"][:3]:
+                    w(f"  - ⚠️ {warn}\n")
+
+                # POST
+                pr = await _post_resource(client, block)
+                if pr["success"]:
+                    w(f"\n**Submitted:** ✅ Created on server → "
+                      f"[{rtype}/{pr['server_id']}]({pr['url']})\n\n")
+                else:
+                    w(f"\n**Submitted:** ❌ {pr['message']}\n\n")
+            else:
+                w("**Validation:** ❌ Errors found\n\n")
+                for e in vr["errors"][:5]:
+                    w(f"  - {e}\n")
+                w("\n**Submitted:** ⏸️ Skipped — fix errors above first\n\n")
+
+    if buf.tell() == header_len:
         return ""
 
-    return "\n".join(sections)
+    return buf.getvalue()
 
 # ---------------------------------------------------------------------------
 # System prompt — rich FHIR conversion expertise
@@ -446,6 +671,29 @@ HAPI FHIR R4 server and submitted if valid. Ensure strict R4 compliance.
 Be concise, accurate, and always format your response in Markdown.
 """
 
+_BASE_SYSTEM_MSG = SystemMessage(content=_FHIR_SYSTEM_PROMPT)
+
+# Bump when the system prompt changes so cached answers are invalidated
+_PROMPT_VERSION = "v1"
+_RESPONSE_CACHE_TTL = 1800  # seconds
+_CACHE_HISTORY_CHARS = 2000
+
+_MAX_FILE_CHARS = 15000
+
+_FILE_TEMPLATE = (
+    "\n\nThe user has attached a file named **{name}** "
+    "(type: `{suffix}`). Here is its content:\n\n"
+    "```\n{content}\n```\n\n"
+    "Use this file content as the **source data** for conversion. "
+    "Analyse the structure, identify healthcare-relevant fields, "
+    "and convert them into the appropriate FHIR R4 resources."
+)
+_BINARY_FILE_TEMPLATE = (
+    "\n\n[Note: The user attached '{name}' but it is a "
+    "binary file type (`{suffix}`). Please ask the user to "
+    "provide the data in a text-based format such as CSV, JSON, XML, or HL7.]"
+)
+
 
 # ---------------------------------------------------------------------------
 # Main invoke function
@@ -457,51 +705,38 @@ async def invoke(
     history: str = "",
     **kwargs,
 ) -> str:
-    """Process a FHIR conversion or healthcare data query."""
+    """Process a FHIR conversion or healthcare data query.
+
+    Explanation-only answers (no FHIR JSON) are cached for identical
+    ``(query, attachment, recent history)``; pass ``force_refresh=True`` to
+    bypass the cache.
+    """
+    file_sha = ""
+    if file_path and os.path.isfile(file_path):
+        file_sha = await asyncio.to_thread(file_digest, file_path)
+    cache_key = make_key(
+        "fhir-agent", _PROMPT_VERSION, query, file_sha, history[-_CACHE_HISTORY_CHARS:]
+    )
+    if not kwargs.get("force_refresh"):
+        cached = await asyncio.to_thread(cache_get, cache_key)
+        if cached is not None:
+            logger.debug("FHIR response cache hit: %s", cache_key[:12])
+            return cached
 
     llm = get_chat_llm(temperature=0.2, max_tokens=4096, name="fhir-agent-llm")
 
     # ── Read attached file if present ────────────────────────────
-    file_context = ""
-    if file_path:
-        path = Path(file_path)
-        if path.exists() and path.suffix.lower() in _TEXT_EXTS:
-            try:
-                content = path.read_text(encoding="utf-8", errors="replace")
-                if len(content) > 15000:
-                    content = content[:15000] + "\n\n… [content truncated for length] …"
-                file_context = (
-                    f"\n\nThe user has attached a file named **{path.name}** "
-                    f"(type: `{path.suffix}`). Here is its content:\n\n"
-                    f"```\n{content}\n```\n\n"
-                    "Use this file content as the **source data** for conversion. "
-                    "Analyse the structure, identify healthcare-relevant fields, "
-                    "and convert them into the appropriate FHIR R4 resources."
-                )
-            except Exception as exc:
-                file_context = (
-                    f"\n\n[Note: Could not read attached file '{path.name}': {exc}]"
-                )
-        elif file_path and Path(file_path).exists():
-            file_context = (
-                f"\n\n[Note: The user attached '{Path(file_path).name}' but it is a "
-                f"binary file type (`{Path(file_path).suffix}`). Please ask the user to "
-                f"provide the data in a text-based format such as CSV, JSON, XML, or HL7.]"
-            )
-
-    # ── Build conversation history context ───────────────────────
-    history_context = ""
-    if history:
-        history_context = (
-            "\n\nHere is the recent conversation history for context:\n"
-            f"{history}\n\n"
-            "Use this history to maintain continuity. If the user refers to "
-            "a previous conversion or resource, use the history to respond accurately."
-        )
+    file_context = await build_file_context(
+        file_path, _TEXT_EXTS, _MAX_FILE_CHARS,
+        template=_FILE_TEMPLATE, binary_template=_BINARY_FILE_TEMPLATE,
+    )
 
     # ── Assemble messages ────────────────────────────────────────
+    # The static system prompt leads so provider-side prompt caching can
+    # reuse it; per-turn history follows in its own message.
     messages = [
-        SystemMessage(content=_FHIR_SYSTEM_PROMPT + history_context),
+        _BASE_SYSTEM_MSG,
+        *history_messages(history, "a previous conversion or resource"),
         HumanMessage(content=query + file_context),
     ]
 
@@ -514,7 +749,11 @@ async def invoke(
     # Only run the pipeline when the LLM produced JSON code blocks
     # (i.e. it generated/converted resources, not just explained concepts)
     hapi_section = ""
-    if "```json" in llm_output:
+    if "```json" not in llm_output:
+        # Conversions are never cached: replaying one would skip (or repeat)
+        # the live HAPI submission
+        await asyncio.to_thread(cache_put, cache_key, llm_output, _RESPONSE_CACHE_TTL)
+    else:
         try:
             hapi_section = await _validate_and_submit(llm_output)
         except Exception as exc:
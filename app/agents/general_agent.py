@@ -9,7 +9,6 @@ in the prompt so it can answer questions about the file.
 from __future__ import annotations
 
 import logging
-from pathlib import Path
 from typing import Optional
 
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -17,10 +16,31 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from app.config import get_settings
 from app.utils.token_counter import add_tokens
 from app.utils.llm_cache import get_chat_llm
+from app.utils.prompt_context import build_file_context, history_messages
 
 logger = logging.getLogger(__name__)
 
-_TEXT_EXTS = {".txt", ".md", ".csv", ".json", ".py", ".js", ".html", ".css", ".xml", ".yaml", ".yml", ".log"}
+_TEXT_EXTS = frozenset({
+    ".txt", ".md", ".csv", ".json", ".py", ".js", ".html", ".css", ".xml", ".yaml", ".yml", ".log",
+})
+
+_BASE_SYSTEM_MSG = SystemMessage(content=(
+    "You are the General Assistant inside Ensō (Multi Agent AI Hub). "
+    "You are helpful, accurate, and concise. Answer the user's question to the best "
+    "of your ability. If you are unsure, say so. Format responses in Markdown when it "
+    "aids readability."
+))
+
+_MAX_FILE_CHARS = 12000
+
+_FILE_TEMPLATE = (
+    "\n\nThe user has attached a file named **{name}**. "
+    "Here is its content:\n\n```\n{content}\n```"
+)
+_BINARY_FILE_TEMPLATE = (
+    "\n\n[Note: The user attached '{name}' but it is a binary file. "
+    "Use the RAG or Multimodal agent for this file type.]"
+)
 
 
 async def invoke(query: str, *, file_path: Optional[str] = None, history: str = "", **kwargs) -> str:
@@ -29,46 +49,16 @@ async def invoke(query: str, *, file_path: Optional[str] = None, history: str =
     llm = get_chat_llm(temperature=0.7, name="general-agent-llm")
 
     # Build optional file context
-    file_context = ""
-    if file_path:
-        path = Path(file_path)
-        if path.exists() and path.suffix.lower() in _TEXT_EXTS:
-            try:
-                content = path.read_text(encoding="utf-8", errors="replace")
-                if len(content) > 12000:
-                    content = content[:12000] + "\n\n… [content truncated for length] …"
-                file_context = (
-                    f"\n\nThe user has attached a file named **{path.name}**. "
-                    f"Here is its content:\n\n```\n{content}\n```"
-                )
-            except Exception as exc:
-                file_context = f"\n\n[Note: Could not read attached file '{path.name}': {exc}]"
-        elif path.exists():
-            file_context = (
-                f"\n\n[Note: The user attached '{path.name}' but it is a binary file. "
-                f"Use the RAG or Multimodal agent for this file type.]"
-            )
-
-    # Build conversation history context
-    history_context = ""
-    if history:
-        history_context = (
-            "\n\nHere is the recent conversation history for context:\n"
-            f"{history}\n\n"
-            "Use this history to maintain continuity. If the user refers to "
-            "something discussed earlier, use the history to respond accurately."
-        )
+    file_context = await build_file_context(
+        file_path, _TEXT_EXTS, _MAX_FILE_CHARS,
+        template=_FILE_TEMPLATE, binary_template=_BINARY_FILE_TEMPLATE,
+    )
 
+    # Static system prompt first so provider-side prompt caching can reuse
+    # it; per-turn history follows in its own message.
     messages = [
-        SystemMessage(
-            content=(
-                "You are the General Assistant inside Ensō (Multi Agent AI Hub). "
-                "You are helpful, accurate, and concise. Answer the user's question to the best "
-                "of your ability. If you are unsure, say so. Format responses in Markdown when it "
-                "aids readability."
-                + history_context
-            )
-        ),
+        _BASE_SYSTEM_MSG,
+        *history_messages(history, "something discussed earlier"),
         HumanMessage(content=query + file_context),
     ]
 
@@ -16,16 +16,28 @@ Authentication uses **DefaultAzureCredential** (role-based access).
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import re
 from pathlib import Path
-from typing import Optional
-
+from typing import Callable, Optional
+
+from azure.search.documents.models import VectorizedQuery
+from langchain_community.vectorstores.azuresearch import (
+    FIELDS_CONTENT,
+    FIELDS_CONTENT_VECTOR,
+    FIELDS_ID,
+    FIELDS_METADATA,
+)
 from langchain_openai import AzureChatOpenAI
+from langchain_core.documents import Document
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from app.config import get_settings
 from app.utils.token_counter import add_tokens
-from app.utils.llm_cache import get_chat_llm, get_vectorstore
+from app.utils.embedding_cache import cached_embed_documents, cached_embed_query
+from app.utils.llm_cache import get_chat_llm, get_embeddings, get_vectorstore
 from app.agents import multimodal_agent
 
 logger = logging.getLogger(__name__)
@@ -33,17 +45,33 @@ logger = logging.getLogger(__name__)
 # Hard-coded index for RTG product catalogue
 _RTG_INDEX_NAME = "rtg-products"
 
+# Fields fetched per hit; the (large) content_vector is deliberately omitted
+_RTG_SELECT_FIELDS = [FIELDS_ID, FIELDS_CONTENT, FIELDS_METADATA]
+
 _IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"}
 
+# Caps concurrent RTG index queries to stay within the Azure Search quota
+_SEARCH_CONCURRENCY = 8
+_search_sem = asyncio.Semaphore(_SEARCH_CONCURRENCY)
+
+# Heading line that opens the advisor's search-query section
+_SEARCH_HEADER_RE = re.compile(r"##[ \t]*search quer", re.IGNORECASE)
+
+# Body of the advisor's "## Search Queries" section, up to the next heading
+_SEARCH_QUERIES_RE = re.compile(
+    r"^[ \t]*##[ \t]*search quer[^\n]*\n(.*?)(?=^[ \t]*##|\Z)",
+    re.IGNORECASE | re.MULTILINE | re.DOTALL,
+)
+
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
 
-def _get_llm(temperature: float = 0.3) -> AzureChatOpenAI:
+def _get_llm(temperature: float = 0.3, *, streaming: bool = False) -> AzureChatOpenAI:
     """Return a cached Azure OpenAI Chat LLM instance."""
-    return get_chat_llm(temperature=temperature, name="ida-agent-llm")
+    return get_chat_llm(temperature=temperature, name="ida-agent-llm", streaming=streaming)
 
 
 # ---------------------------------------------------------------------------
@@ -90,58 +118,145 @@ in a retail catalogue.
 """
 
 
-async def _suggest_furniture(room_analysis: str, query: str) -> str:
-    """LLM suggests furniture based on room analysis."""
-    llm = _get_llm(temperature=0.4)
-    response = await llm.ainvoke([
+_QUERIES_REMINDER = (
+    "\n\nIMPORTANT: end your answer with the '## Search Queries' section, "
+    "one catalogue search query per line."
+)
+
+
+async def _suggest_furniture(
+    room_analysis: str,
+    query: str,
+    on_query: Optional[Callable[[str], None]] = None,
+) -> str:
+    """LLM suggests furniture based on room analysis.
+
+    The reply is streamed; each completed line of its "## Search Queries"
+    section is handed to *on_query* right away so product searches can
+    start while the model is still writing.
+    """
+    llm = _get_llm(temperature=0.4, streaming=True)
+    messages = [
         SystemMessage(content=_FURNITURE_ADVISOR_PROMPT),
         HumanMessage(content=(
             f"User request: {query}\n\n"
             f"## Room Analysis\n{room_analysis}"
         )),
-    ])
-    add_tokens(response)
-    return response.content
+    ]
+
+    parts: list[str] = []
+    final = None
+    pending = ""
+    in_section = done = False
+    async for chunk in llm.astream(messages, stream_usage=True):
+        final = chunk if final is None else final + chunk
+        if not chunk.content:
+            continue
+        parts.append(chunk.content)
+        if on_query is None or done:
+            continue
+        pending += chunk.content
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            stripped = line.strip()
+            if not in_section:
+                in_section = bool(_SEARCH_HEADER_RE.match(stripped))
+            elif stripped.startswith("##"):
+                done = True
+                break
+            elif stripped:
+                on_query(stripped)
+    if final is not None:
+        add_tokens(final)
+    return "".join(parts)
 
 
 # ---------------------------------------------------------------------------
 # Sub-agent 3 — Product Searcher (RTG vector index)
 # ---------------------------------------------------------------------------
 
-async def _search_products(suggestions_text: str) -> str:
+def _hybrid_search(search_query: str, k: int = 3) -> list[Document]:
+    """Hybrid (keyword + vector) top-*k* search over the RTG index.
+
+    Same query as ``AzureSearch.similarity_search`` in hybrid mode, but
+    only the id / content / metadata fields are selected — the stored
+    embedding vector never comes back over the wire.
+    """
+    vectorstore = get_vectorstore(_RTG_INDEX_NAME)
+    vector = cached_embed_query(get_embeddings(), search_query)
+    results = vectorstore.client.search(
+        search_text=search_query,
+        vector_queries=[
+            VectorizedQuery(vector=vector, k_nearest_neighbors=k, fields=FIELDS_CONTENT_VECTOR)
+        ],
+        select=_RTG_SELECT_FIELDS,
+        top=k,
+    )
+    docs: list[Document] = []
+    for result in results:
+        raw_meta = result.get(FIELDS_METADATA)
+        meta = {"id": result.get(FIELDS_ID), **(json.loads(raw_meta) if raw_meta else {})}
+        docs.append(Document(page_content=result.get(FIELDS_CONTENT) or "", metadata=meta))
+    return docs
+
+
+def _extract_queries(suggestions_text: str) -> list[str]:
+    """Return the lines of the advisor's "## Search Queries" section."""
+    match = _SEARCH_QUERIES_RE.search(suggestions_text)
+    if match is None:
+        return []
+    return [stripped for line in match.group(1).splitlines() if (stripped := line.strip())]
+
+
+async def _search_one(search_query: str) -> list[Document]:
+    """Run one hybrid search against the RTG index."""
+    async with _search_sem:
+        return await asyncio.to_thread(_hybrid_search, search_query)
+
+
+async def _search_products(
+    suggestions_text: str,
+    prefetched: Optional[dict[str, asyncio.Task]] = None,
+) -> str:
     """Search the RTG vector index for products matching furniture suggestions.
 
     Parses the "## Search Queries" section from the advisor output and runs
     one hybrid search per query line, collecting product IDs and titles.
+    Searches already started while the advice streamed in (*prefetched*,
+    keyed by query) are reused rather than repeated.
     """
-    vectorstore = get_vectorstore(_RTG_INDEX_NAME)
-
-    # Extract search queries from the "## Search Queries" section
-    queries: list[str] = []
-    in_section = False
-    for line in suggestions_text.splitlines():
-        stripped = line.strip()
-        if stripped.lower().startswith("## search quer"):
-            in_section = True
-            continue
-        if in_section:
-            if stripped.startswith("##"):
-                break  # Next section
-            if stripped:
-                queries.append(stripped)
+    prefetched = prefetched or {}
 
+    queries = _extract_queries(suggestions_text)
     if not queries:
-        # Fallback: use the full suggestions text as a single query
-        queries = [suggestions_text[:500]]
+        # Searching on the whole advice text is slow and imprecise — skip it
+        return (
+            "## Matching Products from RTG Catalogue\n\n"
+            "The advisor did not produce any catalogue search queries, so no "
+            "product search was run. The furniture suggestions above can be "
+            "searched in the RTG catalogue directly."
+        )
+
+    # Embed the remaining queries in one batched request; the vector
+    # store's own per-query embedding calls then hit the embedding cache
+    remaining = [q for q in queries if q not in prefetched]
+    if remaining:
+        try:
+            await asyncio.to_thread(cached_embed_documents, get_embeddings(), remaining)
+        except Exception as exc:
+            logger.warning("RTG batch embedding failed, embedding per query: %s", exc)
+
+    # Searches run concurrently; results are merged in query order
+    all_docs = await asyncio.gather(
+        *(prefetched.get(q) or _search_one(q) for q in queries), return_exceptions=True
+    )
 
     results_parts: list[str] = []
     seen_ids: set[str] = set()
 
-    for search_query in queries:
-        try:
-            docs = vectorstore.similarity_search(search_query, k=3)
-        except Exception as exc:
-            logger.warning("RTG search failed for '%s': %s", search_query, exc)
+    for search_query, docs in zip(queries, all_docs):
+        if isinstance(docs, Exception):
+            logger.warning("RTG search failed for '%s': %s", search_query, docs)
             continue
 
         for doc in docs:
@@ -206,30 +321,39 @@ async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> st
     logger.info("IDA: Step 1 — Analysing room image")
     room_analysis = await _analyse_room(file_path, query)
 
-    # ── Step 2: Suggest furniture ───────────────────────────────
+    # ── Steps 2+3: Suggest furniture, searching as queries stream in ──
     logger.info("IDA: Step 2 — Suggesting furniture")
-    suggestions = await _suggest_furniture(room_analysis, query)
+    prefetched: dict[str, asyncio.Task] = {}
+
+    def _prefetch(search_query: str) -> None:
+        if search_query not in prefetched:
+            prefetched[search_query] = asyncio.create_task(_search_one(search_query))
 
-    # ── Step 3: Search RTG product index ────────────────────────
-    logger.info("IDA: Step 3 — Searching RTG product index")
     try:
-        product_results = await _search_products(suggestions)
-    except Exception as exc:
-        logger.error("IDA: RTG product search failed: %s", exc)
-        product_results = (
-            f"⚠️ Product search encountered an error: {exc}\n\n"
-            "The furniture suggestions above are still valid — "
-            "please search the RTG catalogue manually for matching items."
-        )
+        suggestions = await _suggest_furniture(room_analysis, query, on_query=_prefetch)
+        if not _extract_queries(suggestions):
+            # One corrective retry beats searching on the free-form advice
+            logger.info("IDA: advisor omitted the search queries — retrying once")
+            suggestions = await _suggest_furniture(
+                room_analysis, query + _QUERIES_REMINDER, on_query=_prefetch
+            )
+
+        logger.info("IDA: Step 3 — Searching RTG product index (%d prefetched)", len(prefetched))
+        try:
+            product_results = await _search_products(suggestions, prefetched)
+        except Exception as exc:
+            logger.error("IDA: RTG product search failed: %s", exc)
+            product_results = (
+                f"⚠️ Product search encountered an error: {exc}\n\n"
+                "The furniture suggestions above are still valid — "
+                "please search the RTG catalogue manually for matching items."
+            )
+    finally:
+        for task in prefetched.values():
+            task.cancel()
 
-    # ── Compose final response ──────────────────────────────────
     return (
-        "# 🏠 Interior Design Analysis\n\n"
-        "## Room Analysis\n\n"
-        f"{room_analysis}\n\n"
-        "---\n\n"
-        "## Furniture Recommendations\n\n"
-        f"{suggestions}\n\n"
-        "---\n\n"
+        f"# 🏠 Interior Design Analysis\n\n## Room Analysis\n\n{room_analysis}\n\n---\n\n"
+        f"## Furniture Recommendations\n\n{suggestions}\n\n---\n\n"
         f"{product_results}"
     )
@@ -8,28 +8,38 @@ Authentication uses **DefaultAzureCredential** (role-based access).
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import logging
-import mimetypes
-from pathlib import Path
+import os
 from typing import Optional
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from app.config import get_settings
 from app.utils.token_counter import add_tokens
 from app.utils.llm_cache import get_chat_llm
 
 logger = logging.getLogger(__name__)
 
 
-def _encode_image(image_path: str) -> tuple[str, str]:
-    """Read and base64-encode a local image; return (b64_string, mime_type)."""
-    path = Path(image_path)
-    mime_type = mimetypes.guess_type(str(path))[0] or "image/png"
-    with open(path, "rb") as fh:
-        b64 = base64.standard_b64encode(fh.read()).decode("utf-8")
-    return b64, mime_type
+# Supported image extensions → MIME type (no mimetypes lookup per request)
+_IMAGE_MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".bmp": "image/bmp",
+}
+
+
+def _encode_image(image_path: str) -> str:
+    """Read and base64-encode a local image.
+
+    Blocking — call it through ``asyncio.to_thread``.
+    """
+    with open(image_path, "rb") as fh:
+        return base64.b64encode(fh.read()).decode("ascii")
 
 
 # ---------------------------------------------------------------------------
@@ -39,7 +49,6 @@ def _encode_image(image_path: str) -> tuple[str, str]:
 
 async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> str:
     """Analyse an image (if provided) together with the user's text query."""
-    settings = get_settings()
     history = kwargs.get("history", "")
 
     llm = get_chat_llm(temperature=0.3, name="multimodal-agent-llm")
@@ -57,19 +66,25 @@ async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> st
     content_parts: list[dict] = [{"type": "text", "text": query}]
 
     if file_path:
-        path = Path(file_path)
-        if path.exists() and path.suffix.lower() in {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"}:
-            b64, mime = _encode_image(str(path))
+        name = os.path.basename(file_path)
+        mime = _IMAGE_MIME_TYPES.get(os.path.splitext(file_path)[1].lower())
+        b64 = None
+        if mime is not None:
+            try:
+                b64 = await asyncio.to_thread(_encode_image, file_path)
+            except FileNotFoundError:
+                pass  # reported below like any other unusable upload
+        if b64 is not None:
             content_parts.append(
                 {
                     "type": "image_url",
                     "image_url": {"url": f"data:{mime};base64,{b64}"},
                 }
             )
-            logger.info("Multimodal: attached image %s (%s)", path.name, mime)
+            logger.info("Multimodal: attached image %s (%s)", name, mime)
         else:
             content_parts.append(
-                {"type": "text", "text": f"\n[Note: Uploaded file '{path.name}' is not a supported image format.]"}
+                {"type": "text", "text": f"\n[Note: Uploaded file '{name}' is not a supported image format.]"}
             )
 
     message = HumanMessage(content=content_parts)
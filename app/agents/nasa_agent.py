@@ -12,12 +12,17 @@ Falls back to a media/image search when no specific keyword matches.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import re
+import threading
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional
 
 import nasapy
 import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from app.config import get_settings
@@ -28,109 +33,190 @@ logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
-# nasapy helper – all calls are synchronous so we run them in the agent
+# nasapy helper – all calls are synchronous, so invoke() runs them in a thread
 # ---------------------------------------------------------------------------
 
+_nasa_client: Optional[nasapy.Nasa] = None
+_nasa_lock = threading.Lock()
+
+# Keep-alive pool for the Image Library fallback (called from worker threads)
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+
 def _get_nasa_client() -> nasapy.Nasa:
-    """Return a configured nasapy client."""
-    settings = get_settings()
-    return nasapy.Nasa(key=settings.nasa_api_key)
+    """Return the shared nasapy client (built on first use)."""
+    global _nasa_client
+    if _nasa_client is None:
+        with _nasa_lock:
+            if _nasa_client is None:
+                _nasa_client = nasapy.Nasa(key=get_settings().nasa_api_key)
+    return _nasa_client
+
+
+# Upstream responses, keyed by request parameters.  APOD and NEO windows are
+# stable for the day and sol-1000 rover photos never change, so repeated or
+# retried questions skip the NASA round-trip (and its rate-limit quota).
+_APOD_CACHE: TTLCache = TTLCache(maxsize=128, ttl=3600)
+_ROVER_CACHE: TTLCache = TTLCache(maxsize=256, ttl=86400)
+_NEO_CACHE: TTLCache = TTLCache(maxsize=128, ttl=3600)
+_EARTH_CACHE: TTLCache = TTLCache(maxsize=256, ttl=3600)
+_IMAGE_SEARCH_CACHE: TTLCache = TTLCache(maxsize=512, ttl=1800)
+_cache_lock = threading.Lock()
+
+
+def _cached_call(cache: TTLCache, key: tuple, fetch: Callable[[], Any]) -> Any:
+    """Return ``cache[key]``, calling *fetch* on a miss; errors are not cached."""
+    with _cache_lock:
+        hit = cache.get(key)
+    if hit is not None:
+        return hit
+    value = fetch()
+    if value:
+        with _cache_lock:
+            cache[key] = value
+    return value
+
+
+def _search_images(query: str) -> list[dict]:
+    """Top-5 hits from the NASA Image & Video Library for *query*."""
+    resp = _session.get(
+        "https://images-api.nasa.gov/search",
+        params={"q": query, "media_type": "image"},
+        timeout=15,
+    )
+    resp.raise_for_status()
+    return resp.json().get("collection", {}).get("items", [])[:5]
+
+
+# Keyword router: one scan collects every topic mentioned; _route() then
+# applies the fixed priority APOD > Mars > NEO > Earth imagery > search.
+_ROUTE_RE = re.compile(
+    r"(?P<apod>apod|picture of the day|astronomy picture)"
+    r"|(?P<mars>mars|rover)"
+    r"|(?P<neo>neo|near earth|asteroid)"
+    r"|(?P<earth>earth)"
+    r"|(?P<imagery>image|landsat|satellite)",
+    re.IGNORECASE,
+)
+_ROVERS = ("opportunity", "spirit", "perseverance")
+
+
+def _route(query: str) -> str:
+    found = {m.lastgroup for m in _ROUTE_RE.finditer(query)}
+    for topic in ("apod", "mars", "neo"):
+        if topic in found:
+            return topic
+    if "earth" in found and "imagery" in found:
+        return "earth"
+    return "search"
+
+
+# ── APOD ────────────────────────────────────────────────────────
+def _handle_apod(nasa: nasapy.Nasa, query: str) -> str:
+    today = datetime.today().strftime("%Y-%m-%d")
+    data = _cached_call(_APOD_CACHE, (today,), lambda: nasa.picture_of_the_day(today))
+    if isinstance(data, dict):
+        return (
+            f"**Astronomy Picture of the Day ({data.get('date', today)})**\n\n"
+            f"**Title:** {data.get('title', 'N/A')}\n\n"
+            f"**Explanation:** {data.get('explanation', 'N/A')}\n\n"
+            f"**Image URL:** {data.get('url', 'N/A')}\n\n"
+            f"**HD URL:** {data.get('hdurl', 'N/A')}"
+        )
+    return str(data)
 
 
-def _fetch_nasa_data(query: str) -> str:
-    """Pick the right nasapy method based on keywords and return formatted text."""
-    nasa = _get_nasa_client()
+# ── Mars Rover Photos ───────────────────────────────────────────
+def _handle_mars(nasa: nasapy.Nasa, query: str) -> str:
     q = query.lower()
-    today = datetime.today().strftime("%Y-%m-%d")
+    rover = next((r for r in _ROVERS if r in q), "curiosity")
+
+    photos = _cached_call(
+        _ROVER_CACHE, (rover, 1000), lambda: nasa.mars_rover(sol=1000, rover=rover)
+    )
+    if isinstance(photos, list):
+        photos = photos[:5]
+        lines = [f"**Mars Rover Photos – {rover.title()}** (first 5):"]
+        for p in photos:
+            cam = p.get("camera", {}).get("full_name", "Unknown")
+            lines.append(
+                f"- ID {p.get('id')} | Camera: {cam} | "
+                f"Earth Date: {p.get('earth_date')} | URL: {p.get('img_src')}"
+            )
+        return "\n".join(lines) if photos else "No Mars rover photos found."
+    return str(photos) if photos else "No Mars rover photos found for that sol."
+
+
+# ── Near Earth Objects ──────────────────────────────────────────
+def _handle_neo(nasa: nasapy.Nasa, query: str) -> str:
+    start = datetime.today().strftime("%Y-%m-%d")
+    end = (datetime.today() + timedelta(days=3)).strftime("%Y-%m-%d")
+    data = _cached_call(
+        _NEO_CACHE, (start, end), lambda: nasa.asteroids(start_date=start, end_date=end)
+    )
+    neos = []
+    if isinstance(data, dict):
+        for date_key, objs in data.get("near_earth_objects", {}).items():
+            neos.extend(objs)
+    neos = neos[:5]
+    if neos:
+        lines = ["**Near Earth Objects** (next 3 days, first 5):"]
+        for n in neos:
+            lines.append(
+                f"- {n.get('name', '?')} | Magnitude: {n.get('absolute_magnitude_h', 'N/A')} | "
+                f"Hazardous: {n.get('is_potentially_hazardous_asteroid', 'N/A')}"
+            )
+        return "\n".join(lines)
+    return "No NEO data available for the next 3 days."
 
-    try:
-        # ── APOD ────────────────────────────────────────────────
-        if "apod" in q or "picture of the day" in q or "astronomy picture" in q:
-            data = nasa.picture_of_the_day(today)
-            if isinstance(data, dict):
-                return (
-                    f"**Astronomy Picture of the Day ({data.get('date', today)})**\n\n"
-                    f"**Title:** {data.get('title', 'N/A')}\n\n"
-                    f"**Explanation:** {data.get('explanation', 'N/A')}\n\n"
-                    f"**Image URL:** {data.get('url', 'N/A')}\n\n"
-                    f"**HD URL:** {data.get('hdurl', 'N/A')}"
-                )
-            return str(data)
-
-        # ── Mars Rover Photos ───────────────────────────────────
-        if "mars" in q or "rover" in q:
-            rover = "curiosity"
-            if "opportunity" in q:
-                rover = "opportunity"
-            elif "spirit" in q:
-                rover = "spirit"
-            elif "perseverance" in q:
-                rover = "perseverance"
-
-            photos = nasa.mars_rover(sol=1000, rover=rover)
-            if isinstance(photos, list):
-                photos = photos[:5]
-                lines = [f"**Mars Rover Photos – {rover.title()}** (first 5):"]
-                for p in photos:
-                    cam = p.get("camera", {}).get("full_name", "Unknown")
-                    lines.append(
-                        f"- ID {p.get('id')} | Camera: {cam} | "
-                        f"Earth Date: {p.get('earth_date')} | URL: {p.get('img_src')}"
-                    )
-                return "\n".join(lines) if photos else "No Mars rover photos found."
-            return str(photos) if photos else "No Mars rover photos found for that sol."
-
-        # ── Near Earth Objects ──────────────────────────────────
-        if "neo" in q or "near earth" in q or "asteroid" in q:
-            start = datetime.today().strftime("%Y-%m-%d")
-            end = (datetime.today() + timedelta(days=3)).strftime("%Y-%m-%d")
-            data = nasa.asteroids(start_date=start, end_date=end)
-            neos = []
-            if isinstance(data, dict):
-                for date_key, objs in data.get("near_earth_objects", {}).items():
-                    neos.extend(objs)
-            neos = neos[:5]
-            if neos:
-                lines = ["**Near Earth Objects** (next 3 days, first 5):"]
-                for n in neos:
-                    lines.append(
-                        f"- {n.get('name', '?')} | Magnitude: {n.get('absolute_magnitude_h', 'N/A')} | "
-                        f"Hazardous: {n.get('is_potentially_hazardous_asteroid', 'N/A')}"
-                    )
-                return "\n".join(lines)
-            return "No NEO data available for the next 3 days."
-
-        # ── Earth Imagery (Landsat) ─────────────────────────────
-        if "earth" in q and ("image" in q or "landsat" in q or "satellite" in q):
-            # Default to Atlanta coordinates
-            data = nasa.earth_imagery(lat=33.749, lon=-84.388, date=today)
-            if isinstance(data, dict) and data.get("url"):
-                return (
-                    f"**Earth Imagery (Landsat)**\n\n"
-                    f"Date: {data.get('date', today)}\n"
-                    f"URL: {data.get('url')}"
-                )
-            return "No Earth imagery available for the requested location/date."
-
-        # ── Fallback: NASA Image & Video Library search ─────────
-        resp = requests.get(
-            "https://images-api.nasa.gov/search",
-            params={"q": query, "media_type": "image"},
-            timeout=15,
+
+# ── Earth Imagery (Landsat) ─────────────────────────────────────
+def _handle_earth(nasa: nasapy.Nasa, query: str) -> str:
+    today = datetime.today().strftime("%Y-%m-%d")
+    # Default to Atlanta coordinates
+    data = _cached_call(
+        _EARTH_CACHE,
+        (33.749, -84.388, today),
+        lambda: nasa.earth_imagery(lat=33.749, lon=-84.388, date=today),
+    )
+    if isinstance(data, dict) and data.get("url"):
+        return (
+            f"**Earth Imagery (Landsat)**\n\n"
+            f"Date: {data.get('date', today)}\n"
+            f"URL: {data.get('url')}"
         )
-        resp.raise_for_status()
-        data = resp.json().get("collection", {})
-        items = data.get("items", [])[:5]
-
-        if items:
-            lines = [f'**NASA Image Search** for "{query}" (top 5):']
-            for item in items:
-                d = (item.get("data") or [{}])[0]
-                link = ((item.get("links") or [{}])[0]).get("href", "N/A")
-                lines.append(f"- {d.get('title', 'Untitled')} | {link}")
-            return "\n".join(lines)
-        return f"No NASA results found for '{query}'."
+    return "No Earth imagery available for the requested location/date."
+
+
+# ── Fallback: NASA Image & Video Library search ─────────────────
+def _handle_search(nasa: nasapy.Nasa, query: str) -> str:
+    search_key = (" ".join(query.lower().split()),)
+    items = _cached_call(_IMAGE_SEARCH_CACHE, search_key, lambda: _search_images(query))
+
+    if items:
+        lines = [f'**NASA Image Search** for "{query}" (top 5):']
+        for item in items:
+            d = (item.get("data") or [{}])[0]
+            link = ((item.get("links") or [{}])[0]).get("href", "N/A")
+            lines.append(f"- {d.get('title', 'Untitled')} | {link}")
+        return "\n".join(lines)
+    return f"No NASA results found for '{query}'."
+
 
+_HANDLERS: dict[str, Callable[[nasapy.Nasa, str], str]] = {
+    "apod": _handle_apod,
+    "mars": _handle_mars,
+    "neo": _handle_neo,
+    "earth": _handle_earth,
+    "search": _handle_search,
+}
+
+
+def _fetch_nasa_data(query: str) -> str:
+    """Pick the right nasapy method based on keywords and return formatted text."""
+    try:
+        return _HANDLERS[_route(query)](_get_nasa_client(), query)
     except Exception as exc:
         logger.error("NASA Agent error (nasapy): %s", exc)
         return f"Error querying NASA API: {exc}"
@@ -144,7 +230,8 @@ def _fetch_nasa_data(query: str) -> str:
 async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> str:
     """Fetch NASA data via nasapy and let the LLM compose a user-friendly answer."""
 
-    nasa_data = _fetch_nasa_data(query)
+    # nasapy and requests are blocking — keep the event loop free meanwhile
+    nasa_data = await asyncio.to_thread(_fetch_nasa_data, query)
 
     llm = get_chat_llm(temperature=0.4, name="nasa-agent-llm")
 
@@ -15,7 +15,9 @@ Azure OpenAI and Azure AI Search — no API keys required.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from functools import lru_cache
 from typing import Optional
 
 from langchain.chains import RetrievalQA
@@ -24,9 +26,44 @@ from langchain_core.callbacks import BaseCallbackHandler
 from app.config import get_settings
 from app.utils.token_counter import add_tokens
 from app.utils.llm_cache import get_chat_llm, get_vectorstore
+from app.utils.semantic_cache import SemanticResponseCache, embed_query
 
 logger = logging.getLogger(__name__)
 
+# Near-duplicate questions are answered from here instead of re-running
+# retrieval + LLM; namespaced by index so switching indexes never leaks.
+_answer_cache = SemanticResponseCache(
+    f"rag:{get_settings().azure_search_index_name}", threshold=0.95, ttl=3600
+)
+
+
+class _TokenCapture(BaseCallbackHandler):
+    """Capture token usage from the chain's internal LLM call."""
+
+    def on_llm_end(self, response, **kwargs):
+        for gen_list in response.generations:
+            for gen in gen_list:
+                if hasattr(gen, "message"):
+                    add_tokens(gen.message)
+
+
+@lru_cache(maxsize=4)
+def _get_qa_chain(index_name: str) -> RetrievalQA:
+    """Build (once) the RetrievalQA chain over *index_name*.
+
+    Connects to the *existing* Azure AI Search index via the cached
+    vectorstore; the chain retrieves top-k then asks the LLM.
+    """
+    vectorstore = get_vectorstore(index_name)
+    llm = get_chat_llm(temperature=0.2, name="rag-agent-llm")
+
+    return RetrievalQA.from_chain_type(
+        llm=llm,
+        chain_type="stuff",
+        retriever=vectorstore.as_retriever(),
+        return_source_documents=True,
+    )
+
 
 # ---------------------------------------------------------------------------
 # Public API
@@ -49,32 +86,23 @@ async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> st
     if not clean_query:
         return "Please provide a question after the RAG prefix so I can search the index."
 
+    vec = None
+    try:
+        vec = await embed_query(clean_query)
+        cached = await asyncio.to_thread(_answer_cache.lookup, vec)
+        if cached is not None:
+            logger.debug("RAG cache hit for query: %s", clean_query[:80])
+            return cached
+    except Exception as exc:
+        logger.warning("RAG answer cache unavailable: %s", exc)
+
     logger.info(
         "RAG: searching index '%s' at %s",
         settings.azure_search_index_name,
         settings.azure_search_endpoint,
     )
 
-    # 1. Connect to the *existing* Azure AI Search index via cached vectorstore
-    vectorstore = get_vectorstore(settings.azure_search_index_name)
-
-    # 2. Build a RetrievalQA chain — retrieves top-k then asks the LLM
-    llm = get_chat_llm(temperature=0.2, name="rag-agent-llm")
-
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=vectorstore.as_retriever(),
-        return_source_documents=True,
-    )
-
-    # Callback to capture token usage from the chain's internal LLM call
-    class _TokenCapture(BaseCallbackHandler):
-        def on_llm_end(self, response, **kwargs):
-            for gen_list in response.generations:
-                for gen in gen_list:
-                    if hasattr(gen, "message"):
-                        add_tokens(gen.message)
+    qa_chain = _get_qa_chain(settings.azure_search_index_name)
 
     result = await qa_chain.ainvoke({"query": clean_query}, config={"callbacks": [_TokenCapture()]})
     answer = result.get("result", str(result))
@@ -116,4 +144,10 @@ async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> st
         if citations:
             answer += "\n\n---\n**Citations:**\n" + "\n".join(citations)
 
+    if vec is not None:
+        try:
+            await asyncio.to_thread(_answer_cache.store, clean_query, vec, answer)
+        except Exception as exc:
+            logger.warning("Failed to cache RAG answer: %s", exc)
+
     return answer
@@ -7,6 +7,7 @@ autonomous SQL generation, execution, and natural-language answers.
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -14,10 +15,13 @@ from langchain_community.agent_toolkits.sql.base import create_sql_agent
 from langchain_community.agent_toolkits.sql.toolkit import SQLDatabaseToolkit
 from langchain_community.utilities import SQLDatabase
 from langchain_core.callbacks import BaseCallbackHandler
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 
 from app.config import get_settings
 from app.utils.token_counter import add_tokens
 from app.utils.llm_cache import get_chat_llm
+from app.utils.llm_response_cache import get_or_compute, make_key
 
 logger = logging.getLogger(__name__)
 
@@ -26,10 +30,80 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 _DB_PATH = Path(__file__).resolve().parent.parent.parent / "db" / "northwind.db"
-_DB_URI = f"sqlite:///{_DB_PATH}"
-
-# Create the SQLDatabase instance once
-_db = SQLDatabase.from_uri(_DB_URI)
+# Read-only URI: the agent explores the schema freely but can never write.
+_DB_URI = f"sqlite:///file:{_DB_PATH.as_posix()}?mode=ro&uri=true"
+
+# Applied to every pooled connection.  A read-only handle cannot switch to
+# WAL, but readers never block each other in rollback mode either; the big
+# page cache + mmap cut read syscalls for parallel tool-call SELECTs.
+_SQLITE_PRAGMAS = (
+    "PRAGMA query_only=ON",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+_engine = create_engine(
+    _DB_URI,
+    poolclass=QueuePool,
+    pool_size=8,
+    connect_args={"check_same_thread": False},
+)
+
+
+@event.listens_for(_engine, "connect")
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+# Create the SQLDatabase instance once (backed by the pooled engine)
+_db = SQLDatabase(engine=_engine)
+
+# Northwind is read-only sample data, so answers can be replayed for a
+# repeated question.  Only an exact (whitespace/case-normalised) match
+# counts: near-duplicates like "orders in 1997" / "orders in 1998" embed
+# almost identically but need different SQL.
+_ANSWER_CACHE_TTL = 3600
+
+_PREFIX = (
+    "You are the SQL Agent inside Ensō (Multi Agent AI Hub). "
+    "You have access to a Northwind SQLite database. Answer the user's "
+    "question by querying the database. Always provide:\n"
+    "1. A brief natural-language summary\n"
+    "2. The data in a Markdown table (if applicable)\n"
+    "3. The SQL query you used (in a ```sql code block)\n"
+    "Be concise, accurate, and format your response in Markdown."
+)
+
+
+class _TokenCapture(BaseCallbackHandler):
+    """Capture token usage from the agent's internal LLM calls."""
+
+    def on_llm_end(self, response, **kwargs):
+        for gen_list in response.generations:
+            for gen in gen_list:
+                if hasattr(gen, "message"):
+                    add_tokens(gen.message)
+
+
+@lru_cache(maxsize=4)
+def _build_executor(prefix: str):
+    """Build (once) the SQL agent executor; schema introspection runs here."""
+    llm = get_chat_llm(temperature=0.0, name="sql-agent-llm")
+    toolkit = SQLDatabaseToolkit(db=_db, llm=llm)
+    return create_sql_agent(
+        llm=llm,
+        toolkit=toolkit,
+        verbose=True,
+        agent_type="openai-tools",
+        handle_parsing_errors=True,
+        prefix=prefix,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -40,34 +114,10 @@ _db = SQLDatabase.from_uri(_DB_URI)
 async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> str:
     """Use the LangChain SQL agent to answer questions about Northwind."""
 
-    llm = get_chat_llm(temperature=0.0, name="sql-agent-llm")
-
-    toolkit = SQLDatabaseToolkit(db=_db, llm=llm)
-
-    agent_executor = create_sql_agent(
-        llm=llm,
-        toolkit=toolkit,
-        verbose=True,
-        agent_type="openai-tools",
-        handle_parsing_errors=True,
-        prefix=(
-            "You are the SQL Agent inside Ensō (Multi Agent AI Hub). "
-            "You have access to a Northwind SQLite database. Answer the user's "
-            "question by querying the database. Always provide:\n"
-            "1. A brief natural-language summary\n"
-            "2. The data in a Markdown table (if applicable)\n"
-            "3. The SQL query you used (in a ```sql code block)\n"
-            "Be concise, accurate, and format your response in Markdown."
-        ),
-    )
-
-    # Callback to capture token usage from the agent's internal LLM calls
-    class _TokenCapture(BaseCallbackHandler):
-        def on_llm_end(self, response, **kwargs):
-            for gen_list in response.generations:
-                for gen in gen_list:
-                    if hasattr(gen, "message"):
-                        add_tokens(gen.message)
+    async def _call() -> str:
+        agent_executor = _build_executor(_PREFIX)
+        result = await agent_executor.ainvoke({"input": query}, config={"callbacks": [_TokenCapture()]})
+        return result.get("output", str(result))
 
-    result = await agent_executor.ainvoke({"input": query}, config={"callbacks": [_TokenCapture()]})
-    return result.get("output", str(result))
+    key = make_key("sql-agent", _PREFIX, " ".join(query.lower().split()))
+    return await get_or_compute(key, _call, ttl=_ANSWER_CACHE_TTL)
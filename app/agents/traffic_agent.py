@@ -6,18 +6,19 @@ travel time, distance, and delay information.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
 from typing import Optional
 from urllib import parse as urlparse
 
-import requests
+import httpx
+from cachetools import TTLCache
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from app.config import get_settings
 from app.utils.token_counter import add_tokens
-from app.utils.llm_cache import get_chat_llm
+from app.utils.llm_cache import get_chat_llm, get_http_async_client
 
 logger = logging.getLogger(__name__)
 
@@ -25,17 +26,43 @@ _tomtom_api_key = os.getenv("TOMTOM_MAPS_API_KEY", "")
 _azure_maps_sub_key = os.getenv("AZURE_MAPS_SUBSCRIPTION_KEY", "")
 _azure_maps_client_id = os.getenv("AZURE_MAPS_CLIENT_ID", "")
 
+_GEOCODE_URL = "https://atlas.microsoft.com/search/address/json"
 
-def _geocode(location_name: str) -> tuple[float, float] | None:
+# Place names resolve to the same coordinates for a long time; repeat routes
+# (and the same city on both ends of concurrent requests) skip Azure Maps.
+_geocode_cache: TTLCache = TTLCache(maxsize=1024, ttl=86400)
+_geocode_inflight: dict[str, asyncio.Task] = {}
+
+
+async def _geocode(location_name: str) -> tuple[float, float] | None:
+    """Geocode *location_name*, served from cache or a shared in-flight lookup."""
+    key = " ".join(location_name.lower().split())
+    if key in _geocode_cache:
+        return _geocode_cache[key]
+
+    task = _geocode_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_geocode_uncached(location_name))
+        _geocode_inflight[key] = task
+        task.add_done_callback(lambda _t: _geocode_inflight.pop(key, None))
+    coords = await asyncio.shield(task)
+    if coords is not None:
+        _geocode_cache[key] = coords
+    return coords
+
+
+async def _geocode_uncached(location_name: str) -> tuple[float, float] | None:
     """Geocode a location name using Azure Maps Search Address API."""
-    url = (
-        "https://atlas.microsoft.com/search/address/json"
-        f"?api-version=1.0&query={requests.utils.quote(location_name)}"
-        f"&subscription-key={_azure_maps_sub_key}"
-    )
+    params = {
+        "api-version": "1.0",
+        "query": location_name,
+        "subscription-key": _azure_maps_sub_key,
+    }
     headers = {"x-ms-client-id": _azure_maps_client_id}
     try:
-        resp = requests.get(url, headers=headers, timeout=15)
+        resp = await get_http_async_client().get(
+            _GEOCODE_URL, params=params, headers=headers, timeout=15
+        )
         resp.raise_for_status()
         results = resp.json().get("results", [])
         if not results:
@@ -47,7 +74,7 @@ def _geocode(location_name: str) -> tuple[float, float] | None:
         return None
 
 
-def _get_traffic_route(
+async def _get_traffic_route(
     start: str,
     end: str,
     route_type: str = "fastest",
@@ -59,8 +86,8 @@ def _get_traffic_route(
 ) -> dict | str:
     """Call the TomTom Routing API and return the JSON response."""
 
-    start_geo = _geocode(start)
-    end_geo = _geocode(end)
+    # Both ends are independent — resolve them concurrently
+    start_geo, end_geo = await asyncio.gather(_geocode(start), _geocode(end))
 
     if start_geo is None:
         return f"Could not geocode origin: {start}"
@@ -83,10 +110,10 @@ def _get_traffic_route(
     request_url = base_url + request_params + "&key=" + _tomtom_api_key
 
     try:
-        response = requests.get(request_url, timeout=30)
+        response = await get_http_async_client().get(request_url, timeout=30)
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as exc:
+    except httpx.HTTPError as exc:
         logger.exception("TomTom routing request failed")
         return f"Traffic API error: {exc}"
 
@@ -213,8 +240,6 @@ async def _llm_extract_locations(query: str) -> tuple[str, str]:
 
 async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> str:
     """Get traffic / route info between locations mentioned in the query."""
-    settings = get_settings()
-
     origin, destination = _extract_locations(query)
 
     # If simple extraction failed or returned the whole query, use LLM
@@ -227,7 +252,7 @@ async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> st
             "Try something like: *traffic from Atlanta to Charlotte*"
         )
 
-    traffic_data = _get_traffic_route(origin, destination)
+    traffic_data = await _get_traffic_route(origin, destination)
 
     if isinstance(traffic_data, str):
         return traffic_data
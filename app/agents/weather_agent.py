@@ -11,12 +11,11 @@ import logging
 import os
 from typing import Optional
 
-import requests
+import httpx
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from app.config import get_settings
 from app.utils.token_counter import add_tokens
-from app.utils.llm_cache import get_chat_llm
+from app.utils.llm_cache import get_chat_llm, get_http_async_client
 
 logger = logging.getLogger(__name__)
 
@@ -24,17 +23,22 @@ logger = logging.getLogger(__name__)
 _azure_maps_sub_key = os.getenv("AZURE_MAPS_SUBSCRIPTION_KEY", "")
 _azure_maps_client_id = os.getenv("AZURE_MAPS_CLIENT_ID", "")
 
+_GEOCODE_URL = "https://atlas.microsoft.com/search/address/json"
+_WEATHER_URL = "https://atlas.microsoft.com/weather/currentConditions/json"
 
-def _geocode_azure_maps(location_name: str) -> tuple[float, float] | None:
+
+async def _geocode_azure_maps(location_name: str) -> tuple[float, float] | None:
     """Geocode a location name using Azure Maps Search Address API."""
-    url = (
-        "https://atlas.microsoft.com/search/address/json"
-        f"?api-version=1.0&query={requests.utils.quote(location_name)}"
-        f"&subscription-key={_azure_maps_sub_key}"
-    )
+    params = {
+        "api-version": "1.0",
+        "query": location_name,
+        "subscription-key": _azure_maps_sub_key,
+    }
     headers = {"x-ms-client-id": _azure_maps_client_id}
     try:
-        resp = requests.get(url, headers=headers, timeout=15)
+        resp = await get_http_async_client().get(
+            _GEOCODE_URL, params=params, headers=headers, timeout=15
+        )
         resp.raise_for_status()
         results = resp.json().get("results", [])
         if not results:
@@ -46,31 +50,31 @@ def _geocode_azure_maps(location_name: str) -> tuple[float, float] | None:
         return None
 
 
-def _get_weather_from_azure_maps(location_name: str) -> dict | str:
+async def _get_weather_from_azure_maps(location_name: str) -> dict | str:
     """Geocode *location_name* then fetch current weather from Azure Maps."""
     try:
-        coords = _geocode_azure_maps(location_name)
+        coords = await _geocode_azure_maps(location_name)
         if coords is None:
             return f"Could not geocode location: {location_name}"
 
         lat, lon = coords
-        latlon = f"{lat},{lon}"
-
-        url = (
-            "https://atlas.microsoft.com/weather/currentConditions/json"
-            f"?api-version=1.0&query={latlon}"
-            f"&subscription-key={_azure_maps_sub_key}"
-        )
+        params = {
+            "api-version": "1.0",
+            "query": f"{lat},{lon}",
+            "subscription-key": _azure_maps_sub_key,
+        }
         headers = {
             "Content-Type": "application/json",
             "x-ms-client-id": _azure_maps_client_id,
         }
 
-        response = requests.get(url, headers=headers, timeout=30)
+        response = await get_http_async_client().get(
+            _WEATHER_URL, params=params, headers=headers, timeout=30
+        )
         response.raise_for_status()
         return response.json()
 
-    except requests.exceptions.RequestException as exc:
+    except httpx.HTTPError as exc:
         logger.exception("Azure Maps weather request failed")
         return f"Weather API error: {exc}"
     except Exception as exc:
@@ -169,8 +173,6 @@ async def _llm_extract_location(query: str) -> str:
 
 async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> str:
     """Fetch weather for the location mentioned in the query."""
-    settings = get_settings()
-
     # Try simple extraction first; if it returns the whole query, use LLM
     location_name = _extract_location(query)
     if len(location_name) > 80 or location_name.lower() == query.lower().strip().rstrip("?.,!"):
@@ -179,7 +181,7 @@ async def invoke(query: str, *, file_path: Optional[str] = None, **kwargs) -> st
     if not location_name:
         return "I couldn't determine which location you want weather for. Please specify a city or place."
 
-    weather_data = _get_weather_from_azure_maps(location_name)
+    weather_data = await _get_weather_from_azure_maps(location_name)
 
     if isinstance(weather_data, str):
         # It's an error message
@@ -22,7 +22,9 @@ class Settings(BaseSettings):
     azure_openai_endpoint: str = ""
     azure_openai_api_version: str = "2024-12-01-preview"
     azure_openai_chat_deployment: str = "gpt-4o"
+    azure_openai_mini_deployment: str = "gpt-4o-mini"
     azure_openai_embedding_deployment: str = "text-embedding-3-small"
+    azure_openai_batch_deployment: str = ""
 
     # --- Azure AI Search ---
     azure_search_endpoint: str = ""
@@ -32,6 +34,16 @@ class Settings(BaseSettings):
     rag_chunk_size: int = 1000
     rag_chunk_overlap: int = 200
 
+    # --- CICP ---
+    cicp_batch_mode: bool = False
+
+    # --- Evaluator ---
+    evaluator_mode: str = "combined"  # "combined" | "per_metric" | "sdk"
+    evaluator_row_timeout_s: float = 60.0
+    max_concurrent_judge_calls: int = 10
+    evaluator_rpm_limit: int = 0  # 0 = no client-side rate limit
+    groundedness_context_max_chars: int = 4000  # 0 = send the full context
+
     # --- NASA ---
     nasa_api_key: str = "DEMO_KEY"
     nasa_api_url: str = "https://api.nasa.gov"
@@ -54,6 +66,9 @@ class Settings(BaseSettings):
     log_level: str = "info"
     request_timeout: int = 120
 
+    # --- Cache ---
+    redis_url: str = ""  # e.g. redis://localhost:6379/0; empty = per-process caches only
+
     # --- Data ---
     data_dir: str = str(DATA_DIR)
     max_upload_size_mb: int = 50
@@ -6,8 +6,13 @@ LangSmith tracing, and ensures the data directory exists.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 from fastapi import FastAPI, Request
@@ -15,6 +20,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from app.agents.fhir_agent import close_hapi_client
 from app.config import get_settings, ensure_data_dir
 from app.routes import chat, upload, health, mcp_routes
 from app.utils.tracing import setup_tracing
@@ -23,10 +29,18 @@ from app.utils.tracing import setup_tracing
 # Logging
 # ---------------------------------------------------------------------------
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+# Records are handed to a queue on the request path and written to the
+# console by a background listener thread, so log I/O never blocks the
+# event loop.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    logging.Formatter("%(asctime)s | %(levelname)-8s | %(name)s | %(message)s")
 )
+_log_listener = QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+_log_listener.start()
+
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +54,11 @@ async def lifespan(app: FastAPI):
     """Startup / shutdown lifecycle logic."""
     # Startup
     settings = get_settings()
+    # Sized for blocking file work (PDF parsing, image encoding) offloaded
+    # via asyncio.to_thread so it never stalls the event loop.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4), thread_name_prefix="maaah-io")
+    )
     ensure_data_dir()
     setup_tracing()
 
@@ -52,6 +71,8 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Ensō shutting down")
+    await close_hapi_client()
+    _log_listener.stop()
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,167 @@
+"""Two-tier cache for query embeddings.
+
+Vector searches embed the query text on every call; repeated or retried
+queries (e.g. the same RTG furniture keywords, a re-asked RAG question)
+would otherwise pay an embeddings round-trip each time::
+
+    vec = cached_embed_query(get_embeddings(), "walnut coffee table")
+
+Vectors live in an in-process LRU and are mirrored to a local SQLite file
+under the data directory (24h TTL) so they survive restarts, and to Redis
+(when ``REDIS_URL`` is set) so other workers can reuse them.  Keys are
+namespaced by embedding deployment, so switching models never returns a
+vector from a different embedding space.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any
+
+from app.config import ensure_data_dir
+from app.utils import redis_cache
+
+logger = logging.getLogger(__name__)
+
+_DB_FILE = "embedding_cache.sqlite3"
+_MEMORY_MAX = 2048
+_TTL = 86400  # seconds
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    key        BLOB PRIMARY KEY,
+    vector     BLOB NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+_memory: OrderedDict[bytes, list[float]] = OrderedDict()
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        path = ensure_data_dir() / _DB_FILE
+        _conn = sqlite3.connect(str(path), check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(_SCHEMA)
+        _conn.execute("DELETE FROM embedding_cache WHERE expires_at < ?", (time.time(),))
+        _conn.commit()
+    return _conn
+
+
+def _remember(key: bytes, vector: list[float]) -> None:
+    _memory[key] = vector
+    if len(_memory) > _MEMORY_MAX:
+        _memory.popitem(last=False)
+
+
+def _key(embeddings: Any, text: str) -> bytes:
+    deployment = getattr(embeddings, "deployment", None) or getattr(embeddings, "model", "")
+    return hashlib.sha256(f"{deployment}\0{text}".encode("utf-8")).digest()
+
+
+def _redis_key(key: bytes) -> str:
+    return "emb:" + key.hex()
+
+
+def _lookup(key: bytes) -> list[float] | None:
+    """Return the cached vector for *key* (memory, then disk); caller holds ``_lock``."""
+    vector = _memory.get(key)
+    if vector is not None:
+        _memory.move_to_end(key)
+        return vector
+    try:
+        row = _connect().execute(
+            "SELECT vector FROM embedding_cache WHERE key = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+    except sqlite3.Error as exc:
+        logger.warning("Embedding cache read failed: %s", exc)
+        return None
+    if row is None:
+        return None
+    vector = array("f", row[0]).tolist()
+    _remember(key, vector)
+    return vector
+
+
+def _store(items: list[tuple[bytes, list[float]]]) -> None:
+    """Cache freshly computed vectors; caller holds ``_lock``."""
+    for key, vector in items:
+        _remember(key, vector)
+    try:
+        conn = _connect()
+        expires_at = time.time() + _TTL
+        conn.executemany(
+            "INSERT OR REPLACE INTO embedding_cache VALUES (?, ?, ?)",
+            [(key, array("f", vector).tobytes(), expires_at) for key, vector in items],
+        )
+        conn.commit()
+    except sqlite3.Error as exc:
+        logger.warning("Embedding cache write failed: %s", exc)
+
+
+def cached_embed_query(embeddings: Any, text: str) -> list[float]:
+    """Return ``embeddings.embed_query(text)``, served from cache when possible.
+
+    Cache failures never break the caller — they just fall through to the
+    embeddings API.
+    """
+    key = _key(embeddings, text)
+    with _lock:
+        vector = _lookup(key)
+    if vector is not None:
+        return vector
+
+    blob = redis_cache.get(_redis_key(key))
+    if blob is not None:
+        vector = array("f", blob).tolist()
+        with _lock:
+            _remember(key, vector)
+        return vector
+
+    vector = embeddings.embed_query(text)
+    with _lock:
+        _store([(key, vector)])
+    redis_cache.put(_redis_key(key), array("f", vector).tobytes(), _TTL)
+    return vector
+
+
+def cached_embed_documents(embeddings: Any, texts: list[str]) -> list[list[float]]:
+    """Embed several query texts, sending all cache misses in one request.
+
+    Also warms the cache for later :func:`cached_embed_query` calls on the
+    same texts (e.g. the vector store embedding each search query).
+    """
+    keys = [_key(embeddings, t) for t in texts]
+    with _lock:
+        vectors = [_lookup(k) for k in keys]
+    misses = [i for i, v in enumerate(vectors) if v is None]
+    if misses:
+        blobs = redis_cache.get_many([_redis_key(keys[i]) for i in misses])
+        with _lock:
+            for i, blob in zip(misses, blobs):
+                if blob is not None:
+                    vectors[i] = array("f", blob).tolist()
+                    _remember(keys[i], vectors[i])
+        misses = [i for i in misses if vectors[i] is None]
+    if misses:
+        fresh = embeddings.embed_documents([texts[i] for i in misses])
+        with _lock:
+            _store([(keys[i], v) for i, v in zip(misses, fresh)])
+        redis_cache.put_many(
+            [(_redis_key(keys[i]), array("f", v).tobytes()) for i, v in zip(misses, fresh)],
+            _TTL,
+        )
+        for i, v in zip(misses, fresh):
+            vectors[i] = v
+    return vectors
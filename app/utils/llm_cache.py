@@ -10,14 +10,26 @@ fact that ``AzureChatOpenAI.ainvoke`` is concurrency-safe.
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
-from functools import lru_cache
+import random
+from functools import lru_cache, partial
 
+import httpx
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from langchain_core.messages import AIMessage, BaseMessage
 from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
+from langchain_community.adapters.openai import convert_message_to_dict
 from langchain_community.vectorstores.azuresearch import AzureSearch
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from app.config import get_settings
+from app.utils.embedding_cache import cached_embed_query
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +53,33 @@ def get_token_provider():
     return _token_provider
 
 
+# ---------------------------------------------------------------------------
+# Shared async HTTP connection pool for every Azure OpenAI client
+# ---------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=1)
+def get_http_async_client() -> httpx.AsyncClient:
+    """Return the process-wide ``httpx.AsyncClient`` used by all LLM clients.
+
+    The weather and traffic agents reuse it for their Azure Maps / TomTom
+    REST calls.  One pool means one TLS handshake per host, amortised
+    across every agent and sub-task; HTTP/2 multiplexes concurrent calls (e.g. the
+    ``asyncio.gather`` fan-outs) over a single connection when ``h2`` is
+    installed.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=get_settings().request_timeout,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+    )
+
+
 # ---------------------------------------------------------------------------
 # Cached AzureChatOpenAI instances
 # ---------------------------------------------------------------------------
@@ -53,29 +92,145 @@ def get_chat_llm(
     max_tokens: int | None = None,
     name: str = "cached-llm",
     request_timeout: int | None = None,
+    deployment: str | None = None,
+    streaming: bool = False,
 ) -> AzureChatOpenAI:
     """Return a **cached** ``AzureChatOpenAI`` keyed by its configuration.
 
-    The underlying ``httpx.AsyncClient`` is reused across calls, saving
-    TCP + TLS setup time (~200-400 ms per request).
+    All instances share one pooled ``httpx.AsyncClient`` (see
+    :func:`get_http_async_client`), saving TCP + TLS setup time
+    (~200-400 ms per request).  *deployment* defaults
+    to the main chat deployment; pass e.g. the mini deployment for cheap
+    classification steps.
     """
     settings = get_settings()
     kwargs: dict = dict(
-        azure_deployment=settings.azure_openai_chat_deployment,
+        azure_deployment=deployment or settings.azure_openai_chat_deployment,
         azure_endpoint=settings.azure_openai_endpoint,
         api_version=settings.azure_openai_api_version,
         azure_ad_token_provider=_token_provider,
         temperature=temperature,
         request_timeout=request_timeout or settings.request_timeout,
+        http_async_client=get_http_async_client(),
     )
     if max_tokens is not None:
         kwargs["max_tokens"] = max_tokens
+    if streaming:
+        kwargs["streaming"] = True
     llm = AzureChatOpenAI(**kwargs)
     llm.name = name
-    logger.debug("Created & cached LLM: %s (temp=%s, max_tokens=%s)", name, temperature, max_tokens)
+    logger.debug(
+        "Created & cached LLM: %s (deployment=%s, temp=%s, max_tokens=%s)",
+        name, kwargs["azure_deployment"], temperature, max_tokens,
+    )
     return llm
 
 
+# ---------------------------------------------------------------------------
+# Direct chat-completions call for payload-heavy (vision) requests
+# ---------------------------------------------------------------------------
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+# Same policy as the OpenAI SDK behind ``AzureChatOpenAI``: retry timeouts,
+# connection errors, 408/409/429 and 5xx with jittered exponential backoff,
+# preferring the server's Retry-After when it sends one.
+_RETRY_STATUSES = frozenset({408, 409, 429})
+_MAX_RETRIES = 2
+_MAX_BACKOFF = 8.0  # seconds
+_MAX_RETRY_AFTER = 60.0  # longer server hints are not worth waiting for
+
+
+def _retry_after(resp: httpx.Response | None) -> float | None:
+    """Seconds the server asked us to wait, from ``retry-after-ms`` / ``Retry-After``."""
+    if resp is None:
+        return None
+    try:
+        if "retry-after-ms" in resp.headers:
+            return float(resp.headers["retry-after-ms"]) / 1000
+        return float(resp.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _backoff(attempt: int, resp: httpx.Response | None) -> float:
+    hint = _retry_after(resp)
+    if hint is not None and 0 <= hint <= _MAX_RETRY_AFTER:
+        return hint
+    return min(0.5 * 2 ** attempt, _MAX_BACKOFF) * random.uniform(0.75, 1.0)
+
+
+async def apost_chat_completion(
+    messages: list[BaseMessage],
+    *,
+    temperature: float = 0.0,
+    deployment: str | None = None,
+    max_retries: int = _MAX_RETRIES,
+    **params,
+) -> AIMessage:
+    """Send *messages* straight to the chat-completions endpoint.
+
+    Bypasses ``AzureChatOpenAI`` and serialises the body with ``orjson``
+    (when installed) on the shared connection pool — worthwhile for
+    vision calls whose multi-MB base64 images make stdlib ``json.dumps``
+    a measurable cost.  Extra keyword arguments (e.g. ``response_format``)
+    are added to the request body.  Returns an ``AIMessage`` with
+    ``usage_metadata`` so callers can keep using ``add_tokens``.
+
+    Transient failures are retried up to *max_retries* times; pass ``0``
+    when the caller runs its own retry loop.
+    """
+    settings = get_settings()
+    deployment = deployment or settings.azure_openai_chat_deployment
+    url = (
+        f"{settings.azure_openai_endpoint.rstrip('/')}"
+        f"/openai/deployments/{deployment}/chat/completions"
+    )
+    body = {
+        "messages": [convert_message_to_dict(m) for m in messages],
+        "temperature": temperature,
+        **params,
+    }
+    content = _dumps(body)
+    attempt = 0
+    while True:
+        resp = None
+        try:
+            token = await asyncio.to_thread(_token_provider)
+            resp = await get_http_async_client().post(
+                url,
+                params={"api-version": settings.azure_openai_api_version},
+                content=content,
+                headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+            )
+            resp.raise_for_status()
+            break
+        except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+            retryable = resp is None or resp.status_code in _RETRY_STATUSES or resp.status_code >= 500
+            if not retryable or attempt >= max_retries:
+                raise
+            delay = _backoff(attempt, resp)
+            attempt += 1
+            logger.debug("Chat completion failed (%s); retry %d in %.1fs", exc, attempt, delay)
+            await asyncio.sleep(delay)
+    data = orjson.loads(resp.content) if orjson is not None else resp.json()
+
+    usage = data.get("usage") or {}
+    return AIMessage(
+        content=data["choices"][0]["message"].get("content") or "",
+        usage_metadata={
+            "input_tokens": usage.get("prompt_tokens", 0),
+            "output_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+        },
+    )
+
+
 # ---------------------------------------------------------------------------
 # Cached AzureOpenAIEmbeddings
 # ---------------------------------------------------------------------------
@@ -100,14 +255,18 @@ def get_embeddings() -> AzureOpenAIEmbeddings:
 
 @lru_cache(maxsize=8)
 def get_vectorstore(index_name: str) -> AzureSearch:
-    """Return a **cached** ``AzureSearch`` vector store for *index_name*."""
+    """Return a **cached** ``AzureSearch`` vector store for *index_name*.
+
+    Query embeddings go through :func:`cached_embed_query`, so repeated
+    searches skip the embeddings round-trip.
+    """
     settings = get_settings()
     embeddings = get_embeddings()
     return AzureSearch(
         azure_search_endpoint=settings.azure_search_endpoint,
         azure_search_key=None,
         index_name=index_name,
-        embedding_function=embeddings.embed_query,
+        embedding_function=partial(cached_embed_query, embeddings),
         credential=_credential,
         search_type="hybrid",
     )
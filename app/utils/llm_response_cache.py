@@ -0,0 +1,122 @@
+"""Exact-match cache for LLM sub-task responses.
+
+Agents that re-run the same expensive prompt on identical input (e.g. a
+re-submitted claim form) can wrap the model call with
+:func:`get_or_compute`.  Responses are stored in a local SQLite file under
+the data directory together with the prompt version and an expiry time,
+and shared with other workers through Redis when ``REDIS_URL`` is set::
+
+    text = await get_or_compute(key, lambda: _call_llm(...), ttl=86400)
+
+On a hit the factory is never awaited, so no model call (and no token
+accounting) happens.  Keys should already include the task name and the
+prompt version so a prompt change naturally invalidates old rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable
+
+from app.config import ensure_data_dir
+from app.utils import redis_cache
+
+logger = logging.getLogger(__name__)
+
+_DB_FILE = "llm_response_cache.sqlite3"
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    input_hash TEXT PRIMARY KEY,
+    response   TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        path = ensure_data_dir() / _DB_FILE
+        _conn = sqlite3.connect(str(path), check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(_SCHEMA)
+        _conn.execute("DELETE FROM llm_response_cache WHERE expires_at < ?", (time.time(),))
+        _conn.commit()
+    return _conn
+
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def make_key(*parts: str) -> str:
+    """Combine key parts (task name, prompt version, input hash, …) into one key."""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> str | None:
+    """Return the cached response for *key*, or ``None`` if absent/expired."""
+    with _lock:
+        row = _connect().execute(
+            "SELECT response FROM llm_response_cache WHERE input_hash = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+    if row:
+        return row[0]
+    blob = redis_cache.get("resp:" + key)
+    return blob.decode("utf-8") if blob is not None else None
+
+
+def put(key: str, response: str, ttl: float) -> None:
+    """Store *response* under *key* for *ttl* seconds."""
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_response_cache VALUES (?, ?, ?, ?)",
+            (key, response, now, now + ttl),
+        )
+        conn.commit()
+    redis_cache.put("resp:" + key, response, ttl)
+
+
+async def get_or_compute(
+    key: str,
+    coro_factory: Callable[[], Awaitable[str]],
+    ttl: float = 86400,
+) -> str:
+    """Return the cached response for *key*, computing and storing it on a miss.
+
+    Cache failures never break the caller — they just fall through to
+    *coro_factory*.
+    """
+    try:
+        cached = await asyncio.to_thread(get, key)
+    except sqlite3.Error as exc:
+        logger.warning("LLM response cache read failed: %s", exc)
+        cached = None
+    if cached is not None:
+        logger.debug("LLM response cache hit: %s", key[:12])
+        return cached
+
+    response = await coro_factory()
+    try:
+        await asyncio.to_thread(put, key, response, ttl)
+    except sqlite3.Error as exc:
+        logger.warning("LLM response cache write failed: %s", exc)
+    return response
@@ -0,0 +1,122 @@
+"""Azure OpenAI Batch API helpers.
+
+Non-interactive workloads (e.g. queued insurance claims) can submit their
+chat completions as a single batch job, which is billed at roughly half
+the synchronous token price in exchange for a completion window of up to
+24 hours::
+
+    batch_id = await submit_chat_batch({"claim": body, "damage": body2})
+    ...
+    results = await fetch_batch_results(batch_id)   # None while running
+
+Each *body* is a regular ``/chat/completions`` request body (``model``,
+``messages``, ``temperature``, …).  The client reuses the shared bearer
+token provider and pooled HTTP connection from :mod:`app.utils.llm_cache`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from functools import lru_cache
+from typing import Any
+
+from langchain_community.adapters.openai import convert_message_to_dict
+from langchain_core.messages import BaseMessage
+from openai import AsyncAzureOpenAI
+
+from app.config import get_settings
+from app.utils.llm_cache import get_http_async_client, get_token_provider
+
+logger = logging.getLogger(__name__)
+
+_BATCH_ENDPOINT = "/chat/completions"
+_PENDING_STATUSES = {"validating", "in_progress", "finalizing"}
+
+
+@lru_cache(maxsize=1)
+def _get_client() -> AsyncAzureOpenAI:
+    settings = get_settings()
+    return AsyncAzureOpenAI(
+        azure_endpoint=settings.azure_openai_endpoint,
+        api_version=settings.azure_openai_api_version,
+        azure_ad_token_provider=get_token_provider(),
+        http_client=get_http_async_client(),
+    )
+
+
+def chat_request_body(
+    messages: list[BaseMessage],
+    *,
+    temperature: float = 0.0,
+    deployment: str | None = None,
+) -> dict[str, Any]:
+    """Build a ``/chat/completions`` body from LangChain messages."""
+    settings = get_settings()
+    return {
+        "model": deployment or settings.azure_openai_batch_deployment or settings.azure_openai_chat_deployment,
+        "messages": [convert_message_to_dict(m) for m in messages],
+        "temperature": temperature,
+    }
+
+
+async def submit_chat_batch(requests: dict[str, dict[str, Any]]) -> str:
+    """Upload *requests* (``custom_id → body``) as a batch job; return its id."""
+    client = _get_client()
+    fd, path = tempfile.mkstemp(suffix=".jsonl")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            for custom_id, body in requests.items():
+                line = {"custom_id": custom_id, "method": "POST", "url": _BATCH_ENDPOINT, "body": body}
+                fh.write(json.dumps(line) + "\n")
+        with open(path, "rb") as fh:
+            input_file = await client.files.create(file=fh, purpose="batch")
+    finally:
+        os.unlink(path)
+
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=_BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    logger.info("Submitted batch %s with %d request(s)", batch.id, len(requests))
+    return batch.id
+
+
+async def fetch_batch_results(
+    batch_id: str,
+    *,
+    strict: bool = True,
+) -> dict[str, dict[str, Any]] | None:
+    """Return ``custom_id → response body`` once the batch has completed.
+
+    Returns ``None`` while the job is still running and raises
+    ``RuntimeError`` if it failed, expired or was cancelled.  A failed
+    individual request also raises unless *strict* is false, in which case
+    it is simply omitted from the result.
+    """
+    client = _get_client()
+    batch = await client.batches.retrieve(batch_id)
+    if batch.status in _PENDING_STATUSES:
+        return None
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+
+    content = await client.files.content(batch.output_file_id)
+    results: dict[str, dict[str, Any]] = {}
+    for line in content.text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            if not strict:
+                logger.warning("Batch %s request '%s' failed", batch_id, record.get("custom_id"))
+                continue
+            raise RuntimeError(
+                f"Batch {batch_id} request '{record.get('custom_id')}' failed: {record.get('error')}"
+            )
+        results[record["custom_id"]] = response["body"]
+    return results
@@ -0,0 +1,92 @@
+"""Shared prompt fragments for agents that accept attachments and history.
+
+Agents keep their static system prompt as a module-level message and append
+the per-turn pieces built here, so the long static prefix stays eligible for
+provider-side prompt caching::
+
+    messages = [_BASE_SYSTEM_MSG, *history_messages(history, "...")]
+    messages.append(HumanMessage(content=query + await build_file_context(...)))
+"""
+
+from __future__ import annotations
+
+import asyncio
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.messages import SystemMessage
+
+_TRUNCATION_NOTE = "\n\n… [content truncated for length] …"
+
+
+@lru_cache(maxsize=32)
+def read_text_file(path: str, mtime_ns: int, size: int, max_chars: int) -> str:
+    """Read (and truncate) a text file; keyed on mtime/size so edits re-read.
+
+    Only the first ``4 * max_chars`` bytes (the UTF-8 worst case) are read,
+    so a huge attachment costs no more than a small one.
+    """
+    limit = 4 * max_chars
+    with open(path, "rb") as fh:
+        raw = fh.read(limit)
+    content = raw.decode("utf-8", errors="replace")
+    if len(content) > max_chars or size > limit:
+        content = content[:max_chars] + _TRUNCATION_NOTE
+    return content
+
+
+async def build_file_context(
+    file_path: Optional[str],
+    text_exts: frozenset[str],
+    max_chars: int,
+    *,
+    template: str,
+    binary_template: str,
+) -> str:
+    """Return the prompt fragment describing an attached file.
+
+    Text files are inlined through *template* (``{name}``, ``{suffix}``,
+    ``{content}``); other existing files get *binary_template*.  Missing
+    files produce an empty string.  The stat and read run in a worker
+    thread so a slow filesystem never blocks the event loop.
+    """
+    if not file_path:
+        return ""
+    return await asyncio.to_thread(
+        _file_context, file_path, text_exts, max_chars, template, binary_template
+    )
+
+
+def _file_context(
+    file_path: str,
+    text_exts: frozenset[str],
+    max_chars: int,
+    template: str,
+    binary_template: str,
+) -> str:
+    path = Path(file_path)
+    try:
+        st = path.stat()  # one syscall doubles as the existence check
+    except OSError:
+        return ""
+    name, suffix = path.name, path.suffix
+    if suffix.lower() not in text_exts:
+        return binary_template.format(name=name, suffix=suffix)
+    try:
+        content = read_text_file(file_path, st.st_mtime_ns, st.st_size, max_chars)
+    except Exception as exc:
+        return f"\n\n[Note: Could not read attached file '{name}': {exc}]"
+    return template.format(name=name, suffix=suffix, content=content)
+
+
+def history_messages(history: str, refers_to: str) -> list[SystemMessage]:
+    """Wrap recent conversation *history* in a trailing system message (if any)."""
+    if not history:
+        return []
+    return [SystemMessage(content=(
+        "Here is the recent conversation history for context:\n"
+        f"{history}\n\n"
+        f"Use this history to maintain continuity. If the user refers to "
+        f"{refers_to}, use the history to respond accurately."
+    ))]
@@ -0,0 +1,106 @@
+"""Optional cross-process cache tier backed by Redis.
+
+The embedding and LLM-response caches are local to one worker (memory
+plus a SQLite file).  When ``REDIS_URL`` is set, they also consult and
+populate Redis, so a hit in one worker benefits every other worker and
+fresh processes start warm::
+
+    blob = get("emb:<hash>")          # None on miss or when Redis is off
+    put("emb:<hash>", blob, ttl=86400)
+
+Everything degrades to a no-op when ``redis`` is not installed, the URL
+is empty or malformed, or the server is unreachable (retried after a
+short back-off), so callers never need their own error handling.  Calls
+block on the network, so async code runs them via ``asyncio.to_thread``.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = "maaah:"
+_RETRY_AFTER = 60.0  # seconds to stay L1-only after a Redis error
+
+_client = None
+_disabled_until = 0.0
+_lock = threading.Lock()
+
+
+def _get_client():
+    """Return the shared Redis client, or ``None`` when the tier is off."""
+    global _client, _disabled_until
+    if _client is None:
+        url = get_settings().redis_url
+        if redis is None or not url or _disabled_until == math.inf:
+            return None
+        with _lock:
+            if _client is None and _disabled_until != math.inf:
+                try:
+                    _client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+                except ValueError as exc:
+                    # A malformed URL will not fix itself; stay L1-only for good
+                    _disabled_until = math.inf
+                    logger.warning("Invalid REDIS_URL, Redis cache disabled: %s", exc)
+                    return None
+    return _client if _client is not None and time.monotonic() >= _disabled_until else None
+
+
+def _fail(exc: Exception) -> None:
+    global _disabled_until
+    _disabled_until = time.monotonic() + _RETRY_AFTER
+    logger.warning("Redis cache unavailable, retrying in %.0fs: %s", _RETRY_AFTER, exc)
+
+
+def get(key: str) -> bytes | None:
+    """Return the value stored under *key*, or ``None``."""
+    client = _get_client()
+    if client is None:
+        return None
+    try:
+        return client.get(_PREFIX + key)
+    except redis.RedisError as exc:
+        _fail(exc)
+        return None
+
+
+def get_many(keys: list[str]) -> list[bytes | None]:
+    """Fetch several keys in one round-trip (``None`` for each miss)."""
+    client = _get_client()
+    if client is None or not keys:
+        return [None] * len(keys)
+    try:
+        return client.mget([_PREFIX + k for k in keys])
+    except redis.RedisError as exc:
+        _fail(exc)
+        return [None] * len(keys)
+
+
+def put(key: str, value: bytes | str, ttl: float) -> None:
+    """Store *value* under *key* for *ttl* seconds."""
+    put_many([(key, value)], ttl)
+
+
+def put_many(items: list[tuple[str, bytes | str]], ttl: float) -> None:
+    """Store several values with the same TTL in one pipelined round-trip."""
+    client = _get_client()
+    if client is None or not items:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for key, value in items:
+            pipe.set(_PREFIX + key, value, ex=max(1, int(ttl)))
+        pipe.execute()
+    except redis.RedisError as exc:
+        _fail(exc)
@@ -0,0 +1,238 @@
+"""Persistent semantic response cache.
+
+Stores ``(query embedding → response)`` pairs in a local SQLite file under
+the data directory so answers survive process restarts.  A lookup embeds
+the incoming query with the shared ``AzureOpenAIEmbeddings`` instance and
+returns the stored response of the nearest cached query when its cosine
+similarity clears the configured threshold.
+
+Each cache is isolated by a *namespace* (e.g. ``bank:<index name>``) so
+entries built against one index / prompt version never leak into another.
+Vectors for a namespace are mirrored in memory after first use; SQLite is
+only touched on load and on write.  The in-memory mirror is SQ8
+(symmetric int8, one scale per row), a quarter of the float32 footprint;
+SQLite keeps the full-precision vectors.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.config import ensure_data_dir
+from app.utils.embedding_cache import cached_embed_query
+from app.utils.llm_cache import get_embeddings
+
+logger = logging.getLogger(__name__)
+
+_DB_FILE = "semantic_cache.sqlite3"
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS semantic_cache (
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    embedding  BLOB NOT NULL,
+    response   TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+def _unit(vector: list[float]) -> np.ndarray:
+    vec = np.asarray(vector, dtype="float32")
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _quantize(vec: np.ndarray) -> tuple[np.ndarray, np.float32]:
+    """Symmetric int8 quantisation: ``vec ≈ codes * scale``."""
+    peak = float(np.max(np.abs(vec))) if vec.size else 0.0
+    scale = np.float32(peak / 127.0 if peak else 1.0)
+    codes = np.clip(np.rint(vec / scale), -127, 127).astype(np.int8)
+    return codes, scale
+
+
+async def embed_query(text: str) -> np.ndarray:
+    """Embed *text* with the shared embeddings client and L2-normalise it.
+
+    Goes through the embedding cache, so the retriever's own embedding of
+    the same query text afterwards is a cache hit.
+    """
+    return _unit(await asyncio.to_thread(cached_embed_query, get_embeddings(), text))
+
+
+class SemanticResponseCache:
+    """Namespaced, TTL- and size-bounded semantic cache persisted to SQLite.
+
+    Once ``maxsize`` entries are held, a new entry replaces the one closest
+    to expiry (with a uniform TTL, the oldest).
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        threshold: float = 0.95,
+        ttl: float = 3600.0,
+        maxsize: int = 512,
+        db_path: str | Path | None = None,
+    ):
+        self.namespace = namespace
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._db_path = Path(db_path) if db_path else None
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._keys: list[str] = []
+        self._index: dict[str, int] = {}  # key → row in the mirror
+        self._responses: list[str] = []
+        self._expires: np.ndarray = np.empty(0, dtype="float64")
+        self._codes: np.ndarray | None = None  # (N, dim) int8
+        self._scales: np.ndarray | None = None  # (N,) float32
+        self._loaded = False
+
+    # -- storage ----------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self._db_path is None:
+                self._db_path = ensure_data_dir() / _DB_FILE
+            self._conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+        return self._conn
+
+    def _load(self) -> None:
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "DELETE FROM semantic_cache WHERE namespace = ? AND expires_at < ?",
+            (self.namespace, now),
+        )
+        rows = conn.execute(
+            "SELECT key, embedding, response, expires_at FROM semantic_cache "
+            "WHERE namespace = ? ORDER BY expires_at DESC",
+            (self.namespace,),
+        ).fetchall()
+        if len(rows) > self.maxsize:
+            conn.executemany(
+                "DELETE FROM semantic_cache WHERE namespace = ? AND key = ?",
+                [(self.namespace, r[0]) for r in rows[self.maxsize:]],
+            )
+            rows = rows[:self.maxsize]
+        conn.commit()
+        self._keys = [r[0] for r in rows]
+        self._index = {k: i for i, k in enumerate(self._keys)}
+        self._responses = [r[2] for r in rows]
+        self._expires = np.array([r[3] for r in rows], dtype="float64")
+        self._codes = self._scales = None
+        if rows:
+            quantized = [_quantize(np.frombuffer(r[1], dtype="float32")) for r in rows]
+            self._codes = np.vstack([c for c, _ in quantized])
+            self._scales = np.array([sc for _, sc in quantized], dtype="float32")
+        self._loaded = True
+        logger.debug("Semantic cache '%s' loaded %d entries", self.namespace, len(rows))
+
+    def _prune(self, now: float) -> None:
+        """Drop expired rows from SQLite and the in-memory mirror."""
+        live = self._expires >= now
+        if live.all():
+            return
+        conn = self._connect()
+        conn.execute(
+            "DELETE FROM semantic_cache WHERE namespace = ? AND expires_at < ?",
+            (self.namespace, now),
+        )
+        conn.commit()
+        keep = np.flatnonzero(live)
+        self._keys = [self._keys[i] for i in keep]
+        self._index = {k: i for i, k in enumerate(self._keys)}
+        self._responses = [self._responses[i] for i in keep]
+        self._expires = self._expires[keep]
+        if keep.size:
+            self._codes = self._codes[keep]
+            self._scales = self._scales[keep]
+        else:
+            self._codes = self._scales = None
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        return hashlib.blake2b(" ".join(text.lower().split()).encode("utf-8"), digest_size=16).hexdigest()
+
+    # -- public API -------------------------------------------------------
+
+    def lookup(self, vec: np.ndarray) -> str | None:
+        """Return the cached response nearest to *vec*, or ``None`` on miss."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if self._codes is None:
+                return None
+            # int8 · int8 accumulated in int32, then rescaled per row
+            codes, scale = _quantize(np.asarray(vec, dtype="float32"))
+            sims = np.matmul(self._codes, codes, dtype=np.int32) * (self._scales * scale)
+            # Expired rows never match, so a live neighbour behind one still can
+            sims[self._expires < time.time()] = -np.inf
+            idx = int(np.argmax(sims))
+            if sims[idx] < self.threshold:
+                return None
+            return self._responses[idx]
+
+    def store(self, text: str, vec: np.ndarray, response: str) -> None:
+        """Persist *response* for *text* (embedded as *vec*) with the TTL."""
+        key = self.make_key(text)
+        now = time.time()
+        expires_at = now + self.ttl
+        blob = np.asarray(vec, dtype="float32").tobytes()
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._prune(now)
+            i = self._index.get(key)
+            if i is None and len(self._keys) >= self.maxsize:
+                # Full: reuse the slot of the entry closest to expiry
+                i = int(np.argmin(self._expires))
+                evicted = self._keys[i]
+                del self._index[evicted]
+                self._keys[i] = key
+                self._index[key] = i
+            else:
+                evicted = None
+            conn = self._connect()
+            if evicted is not None:
+                conn.execute(
+                    "DELETE FROM semantic_cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, evicted),
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO semantic_cache VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, blob, response, expires_at),
+            )
+            conn.commit()
+            codes, scale = _quantize(np.asarray(vec, dtype="float32"))
+            if i is not None:
+                self._codes[i] = codes
+                self._scales[i] = scale
+                self._responses[i] = response
+                self._expires[i] = expires_at
+            else:
+                self._index[key] = len(self._keys)
+                self._keys.append(key)
+                self._responses.append(response)
+                self._expires = np.append(self._expires, expires_at)
+                row = codes.reshape(1, -1)
+                if self._codes is None:
+                    self._codes = row
+                    self._scales = np.array([scale], dtype="float32")
+                else:
+                    self._codes = np.vstack([self._codes, row])
+                    self._scales = np.append(self._scales, scale)
@@ -0,0 +1,112 @@
+"""Persistent, TTL-bounded conversation-session state.
+
+Multi-turn agents (e.g. CICP, which collects uploads over several turns)
+keep their per-session state here instead of in a module-level dict, so
+any uvicorn worker on the host can pick up the next turn::
+
+    state = await session_store.get(f"cicp:session:{session_id}") or {}
+    ...
+    await session_store.set(f"cicp:session:{session_id}", state, ttl=3600)
+
+State is JSON-serialised (``orjson`` when installed) into a local SQLite
+file under the data directory.  Every write refreshes the entry's TTL;
+expired rows are ignored on read and purged when the store is opened.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from app.config import ensure_data_dir
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+_DB_FILE = "sessions.sqlite3"
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS sessions (
+    key        TEXT PRIMARY KEY,
+    state      BLOB NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        path = ensure_data_dir() / _DB_FILE
+        _conn = sqlite3.connect(str(path), check_same_thread=False, timeout=5.0)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(_SCHEMA)
+        _conn.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+        _conn.commit()
+    return _conn
+
+
+def _dumps(state: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(state)
+    return json.dumps(state, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(blob: bytes) -> dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(blob)
+    return json.loads(blob)
+
+
+def _get(key: str) -> dict[str, Any] | None:
+    with _lock:
+        row = _connect().execute(
+            "SELECT state FROM sessions WHERE key = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+    return _loads(row[0]) if row else None
+
+
+def _set(key: str, state: dict[str, Any], ttl: float) -> None:
+    blob = _dumps(state)
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+            (key, blob, time.time() + ttl),
+        )
+        conn.commit()
+
+
+def _delete(key: str) -> None:
+    with _lock:
+        conn = _connect()
+        conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+        conn.commit()
+
+
+async def get(key: str) -> dict[str, Any] | None:
+    """Return the state stored under *key*, or ``None`` if absent/expired."""
+    return await asyncio.to_thread(_get, key)
+
+
+async def set(key: str, state: dict[str, Any], ttl: float = 3600) -> None:
+    """Store *state* under *key* for *ttl* seconds."""
+    await asyncio.to_thread(_set, key, state, ttl)
+
+
+async def delete(key: str) -> None:
+    """Forget the state stored under *key*."""
+    await asyncio.to_thread(_delete, key)